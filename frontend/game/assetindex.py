@@ -0,0 +1,59 @@
+# =========================
+#  ASSET INDEX
+# =========================
+import os
+from pathlib import Path
+
+
+class AssetIndex:
+    """
+    exists() for asset lookups without a stat per candidate.
+
+    The first probe into a directory lists it once (os.scandir); every later
+    probe into that directory is a set lookup. Callers keep their own search
+    order and just ask index.exists(candidate) instead of candidate.exists(),
+    so behaviour is unchanged while the pygbag virtual filesystem is hit once
+    per directory instead of once per candidate path.
+    """
+
+    def __init__(self):
+        self._dirs = {}      # directory -> set of entry names (empty if missing)
+        self.listings = 0    # filesystem calls made (one per directory)
+        self.probes = 0      # exists() calls answered
+
+    def _entries(self, folder):
+        key = os.fspath(folder) or "."
+        names = self._dirs.get(key)
+        if names is None:
+            self.listings += 1
+            try:
+                with os.scandir(key) as it:
+                    names = {e.name for e in it}
+            except OSError:
+                names = set()
+            self._dirs[key] = names
+        return names
+
+    def exists(self, path):
+        path = Path(path)
+        self.probes += 1
+        return path.name in self._entries(path.parent)
+
+    def first(self, candidates):
+        """First candidate path that exists, in order, or None."""
+        for c in candidates:
+            if self.exists(c):
+                return Path(c)
+        return None
+
+    def forget(self, folder=None):
+        """Drop cached listings (all, or one directory) after files were added."""
+        if folder is None:
+            self._dirs.clear()
+        else:
+            self._dirs.pop(os.fspath(folder), None)
+
+    def report(self):
+        saved = max(0, self.probes - self.listings)
+        return (f"asset index: {self.probes} lookups, {self.listings} directory listings, "
+                f"{saved} filesystem calls saved")
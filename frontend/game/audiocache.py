@@ -0,0 +1,48 @@
+# =========================
+#  DECODED AUDIO CACHE
+# =========================
+import pygame
+
+
+class PCMCache:
+    """
+    Decoded PCM of every clip loaded through sound(), keyed by (path, mixer format).
+
+    The first sound(path) decodes the file and keeps Sound.get_raw(); after
+    pygame.mixer.quit()/init() with the same format, sound(path) rebuilds the
+    Sound from those bytes with no file I/O or decoding. A different mixer
+    format is a different key, so a clip is never played at the wrong rate.
+    """
+
+    def __init__(self):
+        self._pcm = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path):
+        return (str(path), pygame.mixer.get_init())
+
+    def has(self, path):
+        return self._key(path) in self._pcm
+
+    def sound(self, path):
+        key = self._key(path)
+        raw = self._pcm.get(key)
+        if raw is not None:
+            self.hits += 1
+            return pygame.mixer.Sound(buffer=raw)
+        self.misses += 1
+        snd = pygame.mixer.Sound(str(path))
+        self._pcm[key] = snd.get_raw()
+        return snd
+
+    def clear(self):
+        self._pcm.clear()
+
+    def nbytes(self):
+        return sum(len(b) for b in self._pcm.values())
+
+    def report(self):
+        return (f"pcm cache: {len(self._pcm)} clips, {self.nbytes() / 1024:.0f} KiB, "
+                f"{self.hits} rebuilt from memory, {self.misses} decoded")
@@ -0,0 +1,100 @@
+# =========================
+#  DIRTY-RECT RENDERING
+# =========================
+import pygame
+
+
+def merge_rects(rects):
+    """Union rects that overlap (or touch) until none do; keeps the update list short."""
+    out = [pygame.Rect(r) for r in rects if r.width > 0 and r.height > 0]
+    merged = True
+    while merged:
+        merged = False
+        i = 0
+        while i < len(out):
+            j = i + 1
+            while j < len(out):
+                if out[i].inflate(2, 2).colliderect(out[j]):
+                    out[i].union_ip(out.pop(j))
+                    merged = True
+                else:
+                    j += 1
+            i += 1
+    return out
+
+
+class DirtyRenderer:
+    """
+    Opt-in dirty-rectangle presenter.
+
+    Every frame the game calls begin(), draws as usual while mark()ing the rect
+    of everything it drew, then present(). begin() restores only the background
+    under last frame's rects and present() uploads the merged previous+current
+    rects. When the dirty area exceeds 'full_ratio' of the screen (or after
+    invalidate()) it falls back to a full background blit and full update.
+    When disabled, begin()/present() are the plain full-screen path and mark()
+    returns immediately.
+    """
+
+    def __init__(self, screen, background, enabled=False, full_ratio=0.5):
+        self.screen = screen
+        self.background = background
+        self.enabled = enabled
+        self.full_ratio = full_ratio
+        self._screen_area = screen.get_width() * screen.get_height()
+        self._prev = []
+        self._cur = []
+        self._full = True
+        # stats of the last frame, for profiling
+        self.last_rects = 0
+        self.last_area = 0
+
+    def invalidate(self):
+        """Force a full redraw + full upload on the next frame (state change, resume...)."""
+        self._full = True
+
+    def _area(self, rects):
+        return sum(r.width * r.height for r in rects)
+
+    def begin(self):
+        if not self.enabled:
+            self.screen.blit(self.background, (0, 0))
+            return
+        self._cur = []
+        if self._full or self._area(self._prev) > self.full_ratio * self._screen_area:
+            self.screen.blit(self.background, (0, 0))
+            self._full = True
+            return
+        for r in self._prev:
+            self.screen.blit(self.background, r, r)
+
+    def mark(self, rect):
+        if self.enabled and rect is not None:
+            self._cur.append(pygame.Rect(rect).clip(self.screen.get_rect()))
+        return rect
+
+    def present(self):
+        if not self.enabled:
+            pygame.display.update()
+            return
+        cur = merge_rects(self._cur)
+        rects = merge_rects(self._prev + cur)
+        area = self._area(rects)
+        if self._full or area > self.full_ratio * self._screen_area:
+            pygame.display.update()
+            self.last_rects, self.last_area = 1, self._screen_area
+        else:
+            pygame.display.update(rects)
+            self.last_rects, self.last_area = len(rects), area
+        self._prev = cur
+        self._full = False
+
+    def present_region(self, rect):
+        """Upload only 'rect'; the frame was drawn with the screen clipped to it (idle screens)."""
+        if self.enabled and self._full:
+            self.present()
+            return
+        pygame.display.update(rect)
+        if self.enabled:
+            # marks were clipped to 'rect'; what was drawn outside it is still on screen
+            self._prev = merge_rects(self._prev + self._cur)
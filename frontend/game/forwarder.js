@@ -1,4 +1,4 @@
-// forwarder.js — pygbag -> parent (anti-spam, idempotent)
+// forwarder.js — pygbag <-> parent (anti-spam, idempotent)
 (() => {
   if (window.__pc_forwarder_active) return;
   window.__pc_forwarder_active = true;
@@ -46,6 +46,22 @@
     });
   }
 
+  // parent -> game: the game registers its own 'message' listener (inbox.py);
+  // until it does (or if its bridge can't take callbacks) queue messages here
+  // as JSON strings for it to poll.
+  window.__capy_inbox = [];
+  window.__capy_inbox_n = 0;
+  window.addEventListener('message', (e) => {
+    if (window.__capy_inbox_live) return;
+    if (e.origin !== location.origin) return;   // same rule as inbox.py
+    const m = e.data;
+    if (!m || typeof m !== 'object' || typeof m.type !== 'string') return;
+    const q = window.__capy_inbox;
+    q.push(JSON.stringify(m));
+    if (q.length > 64) q.shift();
+    window.__capy_inbox_n++;
+  });
+
   wrap('notify_run_start', () => sendStart());
   wrap('notify_score',     (n) => sendScore(n));
 
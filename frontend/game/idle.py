@@ -0,0 +1,135 @@
+# =========================
+#  IDLE SCHEDULER
+# =========================
+import time
+
+import pygame
+
+FULL = "full"        # draw everything and present
+REGION = "region"    # draw with the screen clipped to 'rect', upload only that
+SKIP = "skip"        # nothing visible changed: no draw, no present
+
+
+class IdleScheduler:
+    """
+    Per-frame decision on how much drawing a frame needs.
+
+    The caller describes the frame with plan(active, scene, region):
+      - 'scene': a hashable summary of everything visible apart from the
+        animated sprite (state, texts, score...), or None while the screen
+        is busy (play, challenge), which always gets a FULL frame;
+      - 'region': the rect of the one animated sprite on a static screen
+        (the bobbing capybara), or None.
+    The first frame of a scene is FULL; after that only the union of the
+    sprite's old and new rect is redrawn (REGION), and frames where it did not
+    move are skipped. While the window is inactive one FULL frame is drawn
+    (e.g. "Paused") and then every frame is skipped until it is active again.
+
+    wait() replaces the frame-cap tick while inactive: on desktop it blocks
+    in pygame.event.wait() for up to 1/idle_fps and returns at once when an
+    event arrives (re-posted for the loop), so input wakes the game instantly.
+    While active with a frame cap it also blocks in pygame.event.wait() up to
+    the frame's deadline instead of sleeping in Clock.tick(), taking every
+    event the moment it arrives and stamping it with its perf_counter() time
+    as 't' (pygame events carry no timestamp); take_events() hands them to
+    the next frame, in arrival order, ahead of pygame.event.get().
+    """
+
+    def __init__(self, idle_fps=4, enabled=True, can_block=True):
+        self.idle_fps = idle_fps
+        self.enabled = enabled
+        self.can_block = can_block   # False on web: never block the browser thread
+        self.rect = None             # area to redraw on a REGION frame
+        self.frames = {FULL: 0, REGION: 0, SKIP: 0}
+        self._scene = None
+        self._region = None
+        self._active = True
+        self._events = []            # events taken (and stamped) by the last frame wait
+        self._last_tick = None
+
+    def invalidate(self):
+        """Next frame is FULL (something outside the scene key changed)."""
+        self._scene = None
+
+    def plan(self, active, scene, region=None):
+        mode = self._plan(active, scene, region)
+        self.frames[mode] += 1
+        return mode
+
+    def _plan(self, active, scene, region):
+        if not self.enabled or scene is None or active != self._active:
+            self._active = active
+            self._scene = scene
+            self._region = region
+            return FULL
+        if scene != self._scene:
+            self._scene = scene
+            self._region = region
+            return FULL
+        if not active or region == self._region:
+            return SKIP
+        old = self._region
+        self._region = region
+        if region is None:
+            self.rect = pygame.Rect(old)
+        elif old is None:
+            self.rect = pygame.Rect(region)
+        else:
+            self.rect = pygame.Rect(old).union(region)
+        return REGION
+
+    def idle(self):
+        return self.enabled and not self._active
+
+    def wait(self, clock, frame_cap):
+        """End-of-frame pacing: the usual tick, an event-stamping wait, or an input-interruptible idle wait."""
+        if not self.can_block:
+            clock.tick(frame_cap)
+            return
+        if self.idle():
+            ev = pygame.event.wait(int(1000 / self.idle_fps))
+            if ev.type != pygame.NOEVENT:
+                pygame.event.post(ev)
+            clock.tick(0)  # keep the clock's frame time honest after the wait
+            self._last_tick = None
+            return
+        if not frame_cap:
+            clock.tick(0)
+            return
+        now = time.perf_counter()
+        last = self._last_tick
+        deadline = now if last is None else max(now, last + 1.0 / frame_cap)
+        while True:
+            left = deadline - time.perf_counter()
+            if left < 0.001:
+                break
+            ev = pygame.event.wait(int(left * 1000))
+            if ev.type != pygame.NOEVENT:
+                ev.t = time.perf_counter()
+                self._events.append(ev)
+        if left > 0:
+            time.sleep(left)
+        now = time.perf_counter()
+        for ev in pygame.event.get():   # arrived in the last millisecond
+            ev.t = now
+            self._events.append(ev)
+        clock.tick(0)
+        self._last_tick = now
+
+    def take_events(self):
+        """Events taken by the last wait (oldest first); the caller then reads pygame.event.get()."""
+        if not self._events:
+            return self._events
+        ev = self._events
+        self._events = []
+        return ev
+
+    def discard_events(self, types):
+        """Drop taken events of 'types' (like pygame.event.clear(types) for the queue)."""
+        self._events = [ev for ev in self._events if ev.type not in types]
+
+    def report(self):
+        f = self.frames
+        total = max(1, sum(f.values()))
+        return (f"idle: {f[FULL]} full, {f[REGION]} region, {f[SKIP]} skipped frames "
+                f"({(f[REGION] + f[SKIP]) * 100 // total}% light)")
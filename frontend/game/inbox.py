@@ -0,0 +1,101 @@
+# =========================
+#  PARENT-PAGE INBOX
+# =========================
+from collections import deque
+import json
+
+try:
+    from pyodide.ffi import create_proxy
+except Exception:
+    create_proxy = None
+
+INBOX_MAX = 64           # oldest messages are dropped beyond this
+JS_QUEUE = "__capy_inbox"          # filled by forwarder.js when no Python listener is installed
+JS_QUEUE_COUNT = "__capy_inbox_n"  # bumped by forwarder.js on every push
+JS_LIVE = "__capy_inbox_live"      # set once the Python listener is installed
+
+
+class ParentInbox:
+    """
+    parent -> game messages (window 'message' events) as Python dicts.
+
+    install() registers a Python callback on window 'message'; it appends to a
+    local deque, so drain() makes no bridge calls while nothing arrives. If
+    the bridge can't take a Python callback, forwarder.js queues messages on
+    the JS side instead and drain() checks its counter every 'poll_every'
+    frames (one attribute read) before fetching anything.
+    Messages are only accepted from the page's own origin (the parent page is
+    same-origin); sandboxed or data: frames post as "null" and are dropped.
+    """
+
+    def __init__(self, window, poll_every=15):
+        self.window = window
+        self.poll_every = poll_every
+        self.live = False
+        self._queue = deque(maxlen=INBOX_MAX)
+        self._proxy = None
+        self._origin = None
+        self._frame = 0
+        self._seen = 0
+        self.received = 0
+
+    def install(self):
+        w = self.window
+        if w is None:
+            return False
+        try:
+            self._origin = str(w.location.origin)
+            cb = self._on_message
+            self._proxy = create_proxy(cb) if create_proxy is not None else cb
+            w.addEventListener("message", self._proxy)
+            setattr(w, JS_LIVE, True)
+            self.live = True
+        except Exception:
+            self.live = False
+        self._poll_js_queue()   # anything forwarder.js queued before we were listening
+        return self.live
+
+    def _on_message(self, event):
+        try:
+            origin = str(event.origin)
+            if origin != self._origin:   # same rule as forwarder.js
+                return
+            self._push(str(self.window.JSON.stringify(event.data)))
+        except Exception:
+            pass
+
+    def _push(self, text):
+        try:
+            msg = json.loads(text)
+        except Exception:
+            return
+        if isinstance(msg, dict) and "type" in msg:
+            self._queue.append(msg)
+            self.received += 1
+
+    def _poll_js_queue(self):
+        w = self.window
+        try:
+            n = int(getattr(w, JS_QUEUE_COUNT))
+        except Exception:
+            return
+        if n == self._seen:
+            return
+        self._seen = n
+        try:
+            for text in getattr(w, JS_QUEUE).splice(0):
+                self._push(str(text))
+        except Exception:
+            pass
+
+    def drain(self):
+        """Messages received since the last call, oldest first."""
+        if not self.live and self.window is not None:
+            self._frame += 1
+            if self._frame % self.poll_every == 0:
+                self._poll_js_queue()
+        if not self._queue:
+            return ()
+        out = list(self._queue)
+        self._queue.clear()
+        return out
@@ -0,0 +1,46 @@
+# =========================
+#  KEYBOARD HIT GRID
+# =========================
+from array import array
+
+
+class KeyGrid:
+    """
+    Point -> key lookup for an on-screen keyboard laid out in rows.
+
+    Built once from the layout's key rects: one table maps y to a row and,
+    per row, one maps x to a key index, so a tap is two array reads instead
+    of a collidepoint() per key. Taps on the padding between keys hit nothing,
+    exactly like the rects themselves.
+    """
+
+    def __init__(self, keys, width, height):
+        self.keys = keys                           # [(label, rect, enabled, kind)]
+        self.width = width
+        self.height = height
+        self._row_at = array("b", [-1]) * height   # y -> row index, -1 outside every row
+        self._cols = []                            # per row: x -> key index, -1 between keys
+        rows = {}
+        for i, (_, rect, _, _) in enumerate(keys):
+            span = (rect.top, rect.bottom)
+            r = rows.get(span)
+            if r is None:
+                r = rows[span] = len(self._cols)
+                self._cols.append(array("b", [-1]) * width)
+                for y in range(max(0, rect.top), min(height, rect.bottom)):
+                    self._row_at[y] = r
+            cols = self._cols[r]
+            for x in range(max(0, rect.left), min(width, rect.right)):
+                cols[x] = i
+
+    def index_at(self, pos):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return -1
+        r = self._row_at[y]
+        return -1 if r < 0 else self._cols[r][x]
+
+    def key_at(self, pos):
+        """(label, rect, enabled, kind) of the key under 'pos', or None."""
+        i = self.index_at(pos)
+        return None if i < 0 else self.keys[i]
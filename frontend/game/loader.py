@@ -0,0 +1,68 @@
+# =========================
+#  PROGRESSIVE LOADER
+# =========================
+import asyncio
+import time
+
+
+class AssetLoader:
+    """
+    Background loading with a readiness API and boot timings.
+
+    run(job) runs a blocking load function off the frame loop: on a thread
+    pool when 'use_threads' (desktop), else inline as its own asyncio step
+    (web has no threads, but each job at least gets its own frame).
+    run_steps(it) drives a generator one step per frame. mark_ready(name)
+    records when 'name' became available (seconds since 't0') and calls its
+    on_ready() callbacks; reset(name) marks it unavailable again (reload).
+    """
+
+    def __init__(self, t0=None, use_threads=False, workers=2):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.use_threads = use_threads
+        self._executor = None
+        self._workers = workers
+        self.times = {}        # name -> seconds after t0 it (last) became ready
+        self._ready = set()
+        self._callbacks = {}   # name -> [callback(name)]
+
+    # ---------- readiness ----------
+    def ready(self, name):
+        return name in self._ready
+
+    def on_ready(self, name, callback):
+        """Call 'callback(name)' every time 'name' becomes ready (now, if it already is)."""
+        self._callbacks.setdefault(name, []).append(callback)
+        if name in self._ready:
+            callback(name)
+
+    def mark_ready(self, name):
+        self._ready.add(name)
+        self.times[name] = time.perf_counter() - self.t0
+        for cb in self._callbacks.get(name, ()):
+            try:
+                cb(name)
+            except Exception:
+                pass
+
+    def reset(self, *names):
+        for name in names:
+            self._ready.discard(name)
+
+    # ---------- running ----------
+    async def run(self, job):
+        if self.use_threads:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="capy-load")
+            return await asyncio.get_event_loop().run_in_executor(self._executor, job)
+        await asyncio.sleep(0)
+        return job()
+
+    async def run_steps(self, steps):
+        for _ in steps:
+            await asyncio.sleep(0)
+
+    def report(self):
+        parts = [f"{name} {t * 1000:.0f} ms" for name, t in sorted(self.times.items(), key=lambda e: e[1])]
+        return "boot: " + ", ".join(parts)
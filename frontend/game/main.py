@@ -1,10 +1,34 @@
 # === imports ===
 import pygame
-import sys, random, time, math, string, os
+import sys, random, time, math, os
+from collections import namedtuple
+import asyncio
+import base64
 import json as _json
 from pathlib import Path
 from typing import Optional
 
+BOOT_T0 = time.perf_counter()  # boot timings (LOADER.report()) count from here
+
+from pillars import PillarRenderer
+from textcache import FontRegistry, TextCache
+from sprites import RotationTable
+from dirty import DirtyRenderer
+from timestep import FixedStep, FrameStats, FlapQueue
+from profiler import FrameProfiler
+from outbox import Outbox
+from inbox import ParentInbox
+from assetindex import AssetIndex
+from loader import AssetLoader
+from audiocache import PCMCache
+from replay import ReplayRecorder
+from masks import MaskCollider
+from keygrid import KeyGrid
+from idle import IdleScheduler, FULL, REGION, SKIP
+from quality import QualityGovernor
+from world import (GameWorld, Inputs, WIDTH, HEIGHT, GRAVITY, FLAP_VELOCITY,
+                   OBSTACLE_WIDTH, ALLOWED_CHARS, CHALLENGE_TIME_LIMIT)
+
 # =========================
 # --- Messaging hooks for Supabase leaderboard ---
 import sys
@@ -13,6 +37,22 @@ try:
     import js
 except Exception:
     js = None
+try:
+    import emscripten
+except Exception:
+    emscripten = None
+
+
+def _flag(env_name: str, js_name: str) -> bool:
+    """Opt-in switch: env var "1" on desktop, or a truthy window.<js_name> set by the parent page."""
+    if os.environ.get(env_name, "0") == "1":
+        return True
+    if IS_WEB and js is not None:
+        try:
+            return bool(getattr(js.window, js_name))
+        except Exception:
+            return False
+    return False
 
 
 def _dbg_log(text: str):
@@ -26,40 +66,23 @@ def _dbg_log(text: str):
     except Exception:
         pass
 
-# --- robust postMessage helper (JSON -> plain JS object) ---
+# --- parent messages go through a coalescing outbox, flushed once per frame ---
+OUTBOX_INTERVAL = 0.0  # seconds between flushes; 0 = every frame
+OUTBOX = Outbox(js.window if (IS_WEB and js is not None) else None,
+                run_script=emscripten.run_script if emscripten is not None else None,
+                interval=OUTBOX_INTERVAL, coalesce=("SCORE_TICK", "QUALITY"))
+
+# parent -> game updates are pushed into INBOX by a 'message' listener (see inbox.py)
+INBOX = ParentInbox(js.window if (IS_WEB and js is not None) else None)
+
 def _post_to_parent(msg: dict):
+    """Queue 'msg' for the parent page; main() flushes the outbox after present."""
     if not IS_WEB:
         return
-    try:
-        payload = _json.dumps(msg)  # JSON string
-    except Exception:
-        return
-
-    # Prefer direct js bridge
-    try:
-        js.window.top.postMessage(js.JSON.parse(payload), "*")
-        return
-    except Exception:
-        pass
-    try:
-        js.window.parent.postMessage(js.JSON.parse(payload), "*")
-        return
-    except Exception:
-        pass
+    OUTBOX.send(msg)
 
-    # Fallback via emscripten (quote JSON string in JS)
-    if emscripten is not None:
-        try:
-            q = _json.dumps(payload)
-            emscripten.run_script(f"window.top.postMessage(JSON.parse({q}), '*')")
-            return
-        except Exception:
-            try:
-                emscripten.run_script(f"window.parent.postMessage(JSON.parse({q}), '*')")
-            except Exception:
-                pass
-
-# --- sync "my real best" from parent / localStorage into high_score ---
+# --- sync "my real best" from parent / localStorage into high_score (once at boot;
+#     later updates arrive as SET_MY_BEST messages) ---
 def _poll_parent_best():
     if not IS_WEB or js is None:
         return
@@ -99,14 +122,20 @@ def notify_run_start():
         _dbg_log("notify_run_start()")
         _post_to_parent({"type": "RUN_START"})
 
-def notify_score(score: int):
-    """Call once on game over with the final score (int)."""
+# Attach the run's binary replay (base64) to SCORE so the server can re-simulate it
+SEND_REPLAY = _flag("CAPY_SEND_REPLAY", "__capy_send_replay")
+
+def notify_score(score: int, replay: Optional[bytes] = None):
+    """Call once on game over with the final score (int) and optionally the run's replay."""
     global score_sent
     if score_sent:
         return
     score_sent = True
     _dbg_log(f"notify_score({int(score)})")
-    _post_to_parent({"type": "SCORE", "score": int(score)})
+    msg = {"type": "SCORE", "score": int(score)}
+    if replay is not None and SEND_REPLAY:
+        msg["replay"] = base64.b64encode(replay).decode("ascii")
+    _post_to_parent(msg)
 
 def reset_run_flag():
     """Call when resetting to title/ready state."""
@@ -126,22 +155,10 @@ def notify_checkpoint(score: int):
 #  SETUP
 # =========================
 pygame.init()
-WIDTH, HEIGHT = 400, 600
 SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Flappy Bara 🐹")
 # --- Game version (shown only on the start screen) ---
 GAME_VERSION = "v0.2.8"
-# --- Flap cooldown (prevents double jumps on single tap) ---
-FLAP_CD_MS = 120
-last_flap_ms = 0
-
-def try_flap():
-    global last_flap_ms
-    now = pygame.time.get_ticks()
-    if now - last_flap_ms >= FLAP_CD_MS:
-        last_flap_ms = now
-        flap()
-
 
 # =========================
 #  AUDIO & MUTE SETUP
@@ -169,13 +186,23 @@ MUSIC_BG = None  # background loop as Sound on web; None on desktop
 SFX_REWARD = None
 SFX_GAMEOVER = None
 
+# Non-critical assets load in the background; one worker keeps reloads in order
+LOADER = AssetLoader(BOOT_T0, use_threads=not IS_WEB, workers=1)
+MUSIC_WANTED = False  # a gesture asked for music; it starts as soon as it is loaded
+# Decoded clips stay in memory, so a mixer restart (iOS resume) rebuilds Sounds without decoding
+AUDIO_CACHE = PCMCache()
+LAST_AUDIO_RESUME_MS = None
+
 # =========================
 #  ASSET HELPERS (new)
 # =========================
 BASE    = Path(__file__).parent          # /game
 ASSETS  = BASE / "assets"
-IMG_DIRS = [ASSETS / "imgs", ASSETS / "img", ASSETS]
+IMG_DIRS = [ASSETS / "imgs", ASSETS / "img", ASSETS, BASE / "ignore" / "art"]  # last: unbuilt source art
+GEN_DIR = ASSETS / "gen"  # pre-scaled images from tools/build_assets.py
 SND_DIRS = [ASSETS / "sound", ASSETS / "audio", ASSETS]
+# Candidate paths are checked against cached directory listings, not stat'ed one by one
+ASSET_INDEX = AssetIndex()
 
 def _resolve_path(name: str, dirs: list[Path]) -> Path:
     """
@@ -186,25 +213,47 @@ def _resolve_path(name: str, dirs: list[Path]) -> Path:
       4) current working directory (legacy)
     """
     p = Path(name)
-    if p.is_absolute() and p.exists():
+    exists = ASSET_INDEX.exists
+    if p.is_absolute() and exists(p):
         return p
     # direct relative to the game folder
     cand = BASE / p
-    if cand.exists():
+    if exists(cand):
         return cand
     # search within preferred asset dirs (use just the filename)
     for d in dirs:
         q = d / p.name
-        if q.exists():
+        if exists(q):
             return q
     # legacy: whatever the process CWD is
-    if p.exists():
+    if exists(p):
         return p
     raise FileNotFoundError(f"Asset not found: {name} (searched: {', '.join(map(str, dirs))})")
 
-def load_img(name: str) -> pygame.Surface:
+def _load_manifest() -> dict:
+    try:
+        return _json.loads((GEN_DIR / "manifest.json").read_text()).get("images", {})
+    except Exception:
+        return {}
+
+ASSET_MANIFEST = _load_manifest()
+
+def load_img(name: str, size: Optional[tuple] = None, alpha: bool = True) -> pygame.Surface:
+    """
+    Load image 'name' at 'size'. Uses the pre-scaled file from the asset
+    manifest when one was built at exactly that size; otherwise loads the
+    source art and scales it here (dev trees without a build).
+    """
+    entry = ASSET_MANIFEST.get(name)
+    if entry is not None and size is not None and tuple(entry["size"]) == tuple(size):
+        surf = pygame.image.load(str(GEN_DIR / entry["file"]))
+        return surf.convert_alpha() if alpha else surf.convert()
     path = _resolve_path(name, IMG_DIRS)
-    return pygame.image.load(str(path)).convert_alpha()
+    surf = pygame.image.load(str(path))
+    surf = surf.convert_alpha() if alpha else surf.convert()
+    if size is not None and surf.get_size() != tuple(size):
+        surf = pygame.transform.scale(surf, size)
+    return surf
 
 def _first_existing_sound(basename: str, exts: tuple[str, ...]) -> Optional[str]:
     """
@@ -221,17 +270,11 @@ def _first_existing_sound(basename: str, exts: tuple[str, ...]) -> Optional[str]
 
     # try BASE then each SND_DIR with each extension
     search_dirs = [BASE] + SND_DIRS
-    for d in search_dirs:
-        for ext in exts:
-            cand = d / f"{basename}{ext}"
-            if cand.exists():
-                return str(cand)
-    # last chance: process CWD
-    for ext in exts:
-        cand = Path(f"{basename}{ext}")
-        if cand.exists():
-            return str(cand)
-    return None
+    found = ASSET_INDEX.first(d / f"{basename}{ext}" for d in search_dirs for ext in exts)
+    if found is None:
+        # last chance: process CWD
+        found = ASSET_INDEX.first(Path(f"{basename}{ext}") for ext in exts)
+    return str(found) if found is not None else None
 
 def _apply_mute_state():
     if not SOUND_ENABLED:
@@ -253,46 +296,105 @@ def _apply_mute_state():
     except Exception:
         pass
 
-def load_audio_assets():
-    """(Re)load all audio assets after mixer init. Keeps globals up to date."""
-    global MUSIC_BG, SFX_REWARD, SFX_GAMEOVER
+# Prefer WAV on web/iOS, fall back to OGG; desktop can also try mp3/m4a
+AUDIO_EXTS = (".wav", ".ogg") if IS_WEB else (".ogg", ".wav", ".mp3", ".m4a")
+MUSIC_FILE = "flappy_capy_smooth_loop"
+SFX_REWARD_FILE = "reward_ding"
+SFX_GAMEOVER_FILE = "game_over_wah"
+
+def _load_music():
+    global MUSIC_BG
     MUSIC_BG = None
-    SFX_REWARD = None
-    SFX_GAMEOVER = None
-    if not SOUND_ENABLED:
+    path = _first_existing_sound(MUSIC_FILE, AUDIO_EXTS)
+    if not path:
         return
-
-    # Prefer WAV on web/iOS, fall back to OGG; desktop can also try mp3/m4a
-    exts_web     = (".wav", ".ogg")
-    exts_desktop = (".ogg", ".wav", ".mp3", ".m4a")
-    preferred = exts_web if IS_WEB else exts_desktop
-
-    music_path  = _first_existing_sound("flappy_capy_smooth_loop", preferred)
-    reward_path = _first_existing_sound("reward_ding",             preferred)
-    over_path   = _first_existing_sound("game_over_wah",           preferred)
-
     try:
         if IS_WEB:
-            if music_path:
-                MUSIC_BG = pygame.mixer.Sound(music_path)
+            MUSIC_BG = AUDIO_CACHE.sound(path)
         else:
-            if music_path:
-                pygame.mixer.music.load(music_path)
-                pygame.mixer.music.set_volume(MUSIC_VOLUME)
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(MUSIC_VOLUME)
     except Exception:
         pass
 
+def _load_sfx(basename):
+    path = _first_existing_sound(basename, AUDIO_EXTS)
     try:
-        if reward_path:
-            SFX_REWARD = pygame.mixer.Sound(reward_path);  SFX_REWARD.set_volume(SFX_VOLUME)
-        if over_path:
-            SFX_GAMEOVER = pygame.mixer.Sound(over_path);  SFX_GAMEOVER.set_volume(SFX_VOLUME)
+        if path:
+            snd = AUDIO_CACHE.sound(path)
+            snd.set_volume(SFX_VOLUME)
+            return snd
     except Exception:
         pass
+    return None
+
+def _load_reward():
+    global SFX_REWARD
+    SFX_REWARD = _load_sfx(SFX_REWARD_FILE)
+
+def _load_gameover():
+    global SFX_GAMEOVER
+    SFX_GAMEOVER = _load_sfx(SFX_GAMEOVER_FILE)
+
+# (readiness name, blocking load); music first so it can start as early as possible
+AUDIO_JOBS = (("music", _load_music), ("sfx_reward", _load_reward), ("sfx_gameover", _load_gameover))
+AUDIO_NAMES = tuple(name for name, _ in AUDIO_JOBS)
+
+def load_audio_assets():
+    """(Re)load all audio assets after mixer init, blocking. Keeps globals up to date."""
+    if not SOUND_ENABLED:
+        return
+    for name, job in AUDIO_JOBS:
+        job()
+        LOADER.mark_ready(name)
+
+_AUDIO_GEN = 0  # bumped by hard_resume_audio(); a stale background load stops early
+
+async def load_audio_assets_async():
+    """Audio load off the frame loop: thread pool on desktop, one clip per frame on web."""
+    if not SOUND_ENABLED:
+        return
+    gen = _AUDIO_GEN
+    LOADER.reset(*AUDIO_NAMES)
+    for name, job in AUDIO_JOBS:
+        await LOADER.run(job)
+        if gen != _AUDIO_GEN:
+            return  # the mixer was re-initialised meanwhile; the newer load takes over
+        LOADER.mark_ready(name)
+    _dbg_log(ASSET_INDEX.report())  # boot asset lookups are done by now
+    _dbg_log(LOADER.report())
+
+def _start_music():
+    """Start the loop now (music must be loaded); raises if the mixer refuses."""
+    global MUSIC_STARTED, MUSIC_CHANNEL
+    if IS_WEB:
+        if MUSIC_BG is None:
+            return
+        if MUSIC_CHANNEL is None:
+            pygame.mixer.set_num_channels(max(8, pygame.mixer.get_num_channels()))
+            MUSIC_CHANNEL = pygame.mixer.Channel(0)
+        MUSIC_CHANNEL.play(MUSIC_BG, loops=-1)
+        MUSIC_CHANNEL.set_volume(0.0 if is_muted else MUSIC_VOLUME)
+    else:
+        pygame.mixer.music.play(-1)
+    MUSIC_STARTED = True
+    _apply_mute_state()
+
+def _audio_cached():
+    """True when every clip loaded as a Sound is in AUDIO_CACHE for the current mixer format."""
+    names = (SFX_REWARD_FILE, SFX_GAMEOVER_FILE) + ((MUSIC_FILE,) if IS_WEB else ())  # desktop music streams
+    for name in names:
+        path = _first_existing_sound(name, AUDIO_EXTS)
+        if path and not AUDIO_CACHE.has(path):
+            return False
+    return True
 
 def hard_resume_audio():
-    """Re-init mixer AFTER a user gesture, then reload assets and start music."""
-    global SOUND_ENABLED, MUSIC_STARTED, MUSIC_CHANNEL
+    """Re-init mixer AFTER a user gesture, then rebuild sounds; music starts once it is back."""
+    global SOUND_ENABLED, MUSIC_STARTED, MUSIC_WANTED, _AUDIO_GEN, LAST_AUDIO_RESUME_MS
+    t0 = time.perf_counter()
+    _AUDIO_GEN += 1
+    LOADER.reset(*AUDIO_NAMES)
     try:
         pygame.mixer.quit()
         pygame.mixer.pre_init(44100, -16, 2, 512)
@@ -302,51 +404,44 @@ def hard_resume_audio():
         SOUND_ENABLED = False
         return
 
-    load_audio_assets()
     MUSIC_STARTED = False
-    # start music immediately (we're inside a gesture)
-    try:
-        if IS_WEB:
-            if MUSIC_BG is not None:
-                if MUSIC_CHANNEL is None:
-                    pygame.mixer.set_num_channels(max(8, pygame.mixer.get_num_channels()))
-                    MUSIC_CHANNEL = pygame.mixer.Channel(0)
-                MUSIC_CHANNEL.play(MUSIC_BG, loops=-1)
-                MUSIC_CHANNEL.set_volume(0.0 if is_muted else MUSIC_VOLUME)
-        else:
-            pygame.mixer.music.play(-1)
-        MUSIC_STARTED = True
-        _apply_mute_state()
-    except Exception:
-        pass
+    MUSIC_WANTED = True  # we're inside a gesture
+    if _audio_cached():
+        # memory copies only: rebuild inside the gesture (music starts via _on_music_ready)
+        load_audio_assets()
+        source = "pcm cache"
+    else:
+        # boot load not finished yet, or a new mixer format: decode in the background
+        start_task(load_audio_assets_async())
+        source = "background reload"
+    LAST_AUDIO_RESUME_MS = (time.perf_counter() - t0) * 1000
+    _dbg_log(f"audio resume: {LAST_AUDIO_RESUME_MS:.1f} ms ({source}); {AUDIO_CACHE.report()}")
 
 def maybe_start_music():
-    """Start looping music after a user gesture (needed on iOS)."""
-    global MUSIC_STARTED, MUSIC_CHANNEL
+    """Start looping music after a user gesture (needed on iOS); if still loading, once it's ready."""
+    global MUSIC_WANTED
     if MUSIC_STARTED:
         return
+    MUSIC_WANTED = True
+    if not LOADER.ready("music"):
+        return  # _on_music_ready() starts it
     # Try normal start first
     try:
-        if IS_WEB:
-            if MUSIC_BG is not None:
-                if MUSIC_CHANNEL is None:
-                    pygame.mixer.set_num_channels(max(8, pygame.mixer.get_num_channels()))
-                    MUSIC_CHANNEL = pygame.mixer.Channel(0)
-                MUSIC_CHANNEL.play(MUSIC_BG, loops=-1)
-                MUSIC_CHANNEL.set_volume(0.0 if is_muted else MUSIC_VOLUME)
-                MUSIC_STARTED = True
-        else:
-            pygame.mixer.music.play(-1)
-            MUSIC_STARTED = True
-        _apply_mute_state()
+        _start_music()
         return
     except Exception:
         pass
     # If that didn’t work (suspended context), do a hard mixer re-init now
     hard_resume_audio()
 
-# Load sounds once at boot (will be reloaded by hard_resume_audio on iOS if needed)
-load_audio_assets()
+def _on_music_ready(name):
+    if MUSIC_WANTED and not MUSIC_STARTED:
+        try:
+            _start_music()
+        except Exception:
+            pass
+
+LOADER.on_ready("music", _on_music_ready)
 
 MUTE_BTN_SIZE = 36
 mute_button_rect = pygame.Rect(WIDTH - MUTE_BTN_SIZE - 10, 10, MUTE_BTN_SIZE, MUTE_BTN_SIZE)
@@ -364,23 +459,13 @@ def draw_mute_button():
     inner = r.inflate(-2 * pad_x, -2 * pad_y)
 
     label = "MUTE"
-    # Find the largest font that fits in the inner rect
-    lo, hi = 8, max(12, inner.h)  # reasonable bounds
-    best = lo
-    while lo <= hi:
-        mid = (lo + hi) // 2
-        f = pygame.font.SysFont("Arial", mid, bold=True)
-        w, h = f.size(label)
-        if w <= inner.w and h <= inner.h:
-            best = mid
-            lo = mid + 1
-        else:
-            hi = mid - 1
+    # Largest font that fits in the inner rect (searched once, then memoized)
+    best = FONTS.fit_size("Arial", label, inner.w, inner.h, bold=True)
 
     # Render label (slightly dim if muted)
-    f = pygame.font.SysFont("Arial", best, bold=True)
+    f = FONTS.get("Arial", best, bold=True)
     col = (240, 240, 240) if not is_muted else (210, 210, 210)
-    txt = f.render(label, True, col)
+    txt = TEXT.render(f, label, col)
     SCREEN.blit(txt, (r.centerx - txt.get_width() // 2,
                       r.centery - txt.get_height() // 2))
 
@@ -393,250 +478,145 @@ def draw_mute_button():
             (r.right - 6, r.top + 6),     # top-right inside the border
             sw
         )
+    DIRTY.mark(r)
 
 
 
 def _point_in(rect, pos): return rect.collidepoint(pos)
 
 CLOCK = pygame.time.Clock()
-FONT = pygame.font.SysFont("Arial", 32)
-VERSION_FONT = pygame.font.SysFont("Arial", 14)
-
-
-# --- Game variables ---
-# Time-based physics (device independent)
-GRAVITY = 1800.0        # pixels / s^2   (~0.5 per frame at 60 FPS)
-FLAP_VELOCITY = -600.0  # pixels / s     (~-10 per frame at 60 FPS)
-capy_movement = 0.0     # velocity (px/s)
-capy_y = float(HEIGHT // 2)  # precise vertical position as float
+# Fonts and rendered text are cached: steady-state frames build no fonts and rasterize no text
+FONTS = FontRegistry()
+TEXT = TextCache(maxsize=128)
+FONT = FONTS.get("Arial", 32)
+VERSION_FONT = FONTS.get("Arial", 14)
+
+
+# Fixed-step simulation: same game at 30 fps and 144 Hz; CAPY_SIM_HZ trades CPU for precision
+SIM_HZ = int(os.environ.get("CAPY_SIM_HZ", "120"))  # integer: replays store it as u16
+SIM_MAX_STEPS = 8            # catch-up cap per frame; slow devices slow down instead of spiralling
+SIM = FixedStep(SIM_HZ, SIM_MAX_STEPS)
+
+# --- Game world: all gameplay state and rules live in world.GameWorld ---
+# Each run is seeded and recorded; the replay can ride along with SCORE (see notify_score)
+WORLD = GameWorld(recorder=ReplayRecorder(SIM_HZ))
+INPUTS = Inputs()  # intents gathered from events, consumed by the next simulation step
+# Taps are applied in the step covering the moment they arrived (stamped by IDLE.wait on
+# desktop), not the frame's first step; web taps have no time and keep the first step.
+# The world rate-limits flaps itself. CAPY_STAMPED_FLAPS=0 restores the old behaviour.
+FLAPS = FlapQueue(stamped=os.environ.get("CAPY_STAMPED_FLAPS", "1") == "1")
 
-game_state = "start"
-score = 0
 high_score = 0
-gameover_time = 0
 played_gameover_sound = False
 
-# NEW: pull best from parent once at boot (if available)
+# NEW: pull best from parent once at boot (if available), then listen for pushes
 _poll_parent_best()
-
-# --- HARDEN: flap rate limit ---
-MAX_FLAPS_PER_SEC = 12.0
-MIN_FLAP_INTERVAL = 1.0 / MAX_FLAPS_PER_SEC
-last_flap_time = 0.0
-
-def try_flap():
-    global capy_movement, last_flap_time
-    t = time.perf_counter()
-    if t - last_flap_time >= MIN_FLAP_INTERVAL:
-        capy_movement = FLAP_VELOCITY
-        last_flap_time = t
+INBOX.install()
 
 # =========================
 #  ASSETS (uses new helpers)
 # =========================
-background_img = load_img("capy back.png").convert()
-background_img = pygame.transform.scale(background_img, (WIDTH, HEIGHT))
-
-capy_img = load_img("flappy capy.png")
-capy_img = pygame.transform.scale(capy_img, (60, 45))
-capy_rect = pygame.Rect(0, 0, 35, 25)
-capy_rect.center = (100, HEIGHT // 2)
+background_img = load_img("capy back.png", (WIDTH, HEIGHT), alpha=False)
+
+# Opt-in dirty-rect presenter (CAPY_DIRTY_RECTS=1): restores/uploads only what changed
+DIRTY_RECTS = os.environ.get("CAPY_DIRTY_RECTS", "0") == "1"
+DIRTY = DirtyRenderer(SCREEN, background_img, enabled=DIRTY_RECTS)
+
+capy_img = load_img("flappy capy.png", (60, 45))
+LOADER.mark_ready("images")  # all the start screen needs
+
+# --- Pre-rotated capybara: tilt = -velocity * CAPY_TILT, quantized to CAPY_ROT_STEP ---
+CAPY_TILT = 0.05       # degrees per px/s; tuned to feel like before
+CAPY_ROT_STEP = 2.0    # degrees between table entries
+# fastest reachable fall: flap at the top edge, then drop through the whole screen
+CAPY_MAX_FALL_SPEED = math.sqrt(FLAP_VELOCITY**2 + 2 * GRAVITY * (HEIGHT + 50))
+# Angles are pre-rotated in the background (warm_rotations); until then entries build on first use
+CAPY_ROT = RotationTable(capy_img, -CAPY_MAX_FALL_SPEED * CAPY_TILT,
+                         -FLAP_VELOCITY * CAPY_TILT, CAPY_ROT_STEP)
+
+async def warm_rotations():
+    await LOADER.run_steps(CAPY_ROT.warm_steps(8))
+    if WORLD.collider is not None:
+        await LOADER.run_steps(WORLD.collider.warm_steps(8))
+    LOADER.mark_ready("rotations")
+    _dbg_log(CAPY_ROT.report())
 
 # =========================
 #  PILLARS
 # =========================
-OBSTACLE_WIDTH = 60
-OBSTACLE_HITBOX_INSET_X = 8   # pixels trimmed from each side for fair collisions
-SCROLL_SPEED   = 150
-SPAWN_OFFSET_X = WIDTH + 60
-OBSTACLE_SPACING_X = 150   # phone-friendly spacing (was 130)
-SPACING_JITTER = 15
-SPAWN_EDGE_GUARD = 40
-
-obstacles = []
-spawning_enabled = False
-next_spacing_x = OBSTACLE_SPACING_X
-
-def make_pillar_surface(gap_y, gap_size):
-    """
-    Render each pillar section as a soft gold coin stack:
-    - Left/right rim shading (horizontal gradient)
-    - Soft specular highlight band
-    - Subtle coin ridges (paired light/dark 1px lines)
-    """
-    surf = pygame.Surface((OBSTACLE_WIDTH, HEIGHT), pygame.SRCALPHA)
-
-    # --- Gold palette (less cartoony / less bright) ---
-    GOLD_SHADOW = (90, 70, 25)     # deep bronze
-    GOLD_MID    = (170, 135, 40)   # muted gold
-    GOLD_LIGHT  = (210, 190, 120)  # soft highlight (less bright)
-    
-    RIDGE_LIGHT  = (220, 200, 150, 80)# light ridge line (semi-transparent)
-    RIDGE_DARK   = (80, 60, 30, 70)   # shadow ridge line (semi-transparent)
-    BORDER_DARK  = (120, 85, 26, 180)   # inner border for definition
-
-    gap_top = max(0, gap_y - gap_size // 2)
-    gap_bot = min(HEIGHT, gap_y + gap_size // 2)
-    top_rect    = pygame.Rect(0, 0, OBSTACLE_WIDTH, max(0, gap_top))
-    bottom_rect = pygame.Rect(0, gap_bot, OBSTACLE_WIDTH, max(0, HEIGHT - gap_bot))
-
-    def lerp(a, b, t): return a + (b - a) * t
-    def lerp_color(c1, c2, t):
-        return (int(lerp(c1[0], c2[0], t)),
-                int(lerp(c1[1], c2[1], t)),
-                int(lerp(c1[2], c2[2], t)))
-
-    def fill_horizontal_gradient(target, rect, left_color, mid_color, right_color, mid_pos=0.38):
-        """Left->mid->right three-stop gradient across the width."""
-        w = rect.width
-        if w <= 0 or rect.height <= 0: return
-        for ix in range(w):
-            x = ix / max(1, w - 1)
-            if x <= mid_pos:
-                t = x / max(1e-6, mid_pos)
-                col = lerp_color(left_color, mid_color, t)
-            else:
-                t = (x - mid_pos) / max(1e-6, 1.0 - mid_pos)
-                col = lerp_color(mid_color, right_color, t)
-            pygame.draw.line(target, col, (rect.left + ix, rect.top), (rect.left + ix, rect.bottom - 1))
-
-    def draw_coin_ridges(target, rect, step=16):
-        # Two 1px lines (light then slight shadow) every 'step' pixels
-        y = rect.top + 10
-        while y < rect.bottom - 10:
-            if rect.height <= 0: break
-            pygame.draw.line(target, RIDGE_LIGHT, (rect.left + 5, y),  (rect.right - 6, y))
-            y2 = y + 2
-            if y2 < rect.bottom - 2:
-                pygame.draw.line(target, RIDGE_DARK,  (rect.left + 5, y2), (rect.right - 6, y2))
-            y += step
-
-    def edge_sheen_and_border(target, rect):
-        # Slight left/right rim darkening and a slim specular band
-        pygame.draw.rect(target, (0, 0, 0, 60), (rect.left,        rect.top, 3, rect.height))  # left shadow
-        pygame.draw.rect(target, (0, 0, 0, 70), (rect.right - 4,   rect.top, 4, rect.height))  # right shadow
-        # Specular highlight band ~35% from the left
-        band_w = max(2, rect.width // 10)
-        band_x = rect.left + int(rect.width * 0.35)
-        highlight = pygame.Surface((band_w, rect.height), pygame.SRCALPHA)
-        for iy in range(rect.height):
-            t = 1.0 - abs((iy / max(1, rect.height - 1)) - 0.5) * 2.0  # stronger in the middle
-            a = int(20 + 20 * t)  # 20..40 alpha → much more subtle
-            pygame.draw.line(highlight, (255, 255, 255, a), (0, iy), (band_w - 1, iy))
-        target.blit(highlight, (band_x, rect.top))
-
-        # Soft inner border for definition (rounded a touch)
-        inset = rect.inflate(-2, -2)
-        if inset.width > 0 and inset.height > 0:
-            pygame.draw.rect(target, BORDER_DARK, inset, width=2, border_radius=6)
-
-    def draw_section(rect):
-        if rect.height <= 0: return
-        # base fill with a 3-stop horizontal gradient (gives "cylinder" feel)
-        fill_horizontal_gradient(surf, rect, GOLD_SHADOW, GOLD_LIGHT, GOLD_MID, mid_pos=0.40)
-        draw_coin_ridges(surf, rect, step=24)     # subtle 1px coin edges
-        edge_sheen_and_border(surf, rect)         # sheen + definition
-
-    draw_section(top_rect)
-    draw_section(bottom_rect)
-
-    # carve out the gap as transparent
-    gap_rect = pygame.Rect(0, gap_top, OBSTACLE_WIDTH, max(0, gap_bot - gap_top))
-    if gap_rect.height > 0:
-        surf.fill((0, 0, 0, 0), gap_rect)
+# Shared strips: pillars are drawn from these, nothing is rendered per spawn
+PILLARS = PillarRenderer(OBSTACLE_WIDTH, HEIGHT)
+
+def draw_obstacles(alpha=1.0):
+    """'alpha' interpolates between the previous and current simulation step."""
+    pillars = PILLAR_DRAW
+    for ob in WORLD.obstacles:
+        x = int(ob.px + (ob.x - ob.px) * alpha)
+        pillars.draw(SCREEN, x, ob.gap_y, ob.gap_size)
+        DIRTY.mark((x, 0, OBSTACLE_WIDTH, HEIGHT))
+
+# Opt-in pixel-accurate collision (CAPY_PIXEL_COLLISION=1): what you see is what you hit,
+# instead of the inset hitbox rects. Fixed for the session so a run never changes rules.
+PIXEL_COLLISION = _flag("CAPY_PIXEL_COLLISION", "__capy_pixel_collision")
+if PIXEL_COLLISION:
+    WORLD.collider = MaskCollider(CAPY_ROT, CAPY_TILT, PILLARS)
 
-    return surf
-
-def spawn_obstacle():
-    if obstacles:
-        last_x = obstacles[-1]["x"]
-        if last_x > SPAWN_OFFSET_X - SPAWN_EDGE_GUARD: return
-    gap_size = random.randint(150, 180)
-    margin = 100
-    gap_y = random.randint(margin, HEIGHT - margin)
-    obstacles.append({"x": SPAWN_OFFSET_X,"gap_y": gap_y,"gap_size": gap_size,
-                      "surf": make_pillar_surface(gap_y, gap_size),"scored": False})
-
-def maybe_spawn_by_distance():
-    global next_spacing_x
-    if not spawning_enabled: return
-    if not obstacles:
-        spawn_obstacle()
-        next_spacing_x = OBSTACLE_SPACING_X + random.randint(-SPACING_JITTER, SPACING_JITTER)
-        return
-    last_x = obstacles[-1]["x"]
-    if last_x <= WIDTH - next_spacing_x:
-        spawn_obstacle()
-        next_spacing_x = OBSTACLE_SPACING_X + random.randint(-SPACING_JITTER, SPACING_JITTER)
-
-def update_obstacles(dt):
-    alive = []
-    for ob in obstacles:
-        ob["x"] -= SCROLL_SPEED * dt
-        if ob["x"] + OBSTACLE_WIDTH > -50: alive.append(ob)
-    return alive
-
-def draw_obstacles():
-    for ob in obstacles: SCREEN.blit(ob["surf"], (int(ob["x"]), 0))
-
-def obstacle_hitboxes(ob):
-    x = int(ob["x"]); gap_y = ob["gap_y"]; gap_size = ob["gap_size"]
-    inset = OBSTACLE_HITBOX_INSET_X
-    w = max(2, OBSTACLE_WIDTH - 2*inset)
-    top_rect    = pygame.Rect(x + inset, 0, w, gap_y - gap_size//2)
-    bottom_rect = pygame.Rect(x + inset, gap_y + gap_size//2, w, HEIGHT - (gap_y + gap_size//2))
-    return top_rect, bottom_rect
-
-def check_collision_single_column():
-    for ob in obstacles:
-        r1, r2 = obstacle_hitboxes(ob)
-        if capy_rect.colliderect(r1) or capy_rect.colliderect(r2): return False
-    if capy_rect.top <= -50 or capy_rect.bottom >= HEIGHT: return False
-    return True
+# =========================
+#  ADAPTIVE QUALITY
+# =========================
+# Tiers, best first: pillar look ("style" or "style-rle", see PillarRenderer), capybara
+# tilt step (None = upright), see-through challenge overlay, target fps. Each tier costs
+# less per displayed second than the one above (selfcheck quality_tiers). The governor
+# steps down when busy frames miss the budget and back up with headroom; the parent
+# page gets {"type": "QUALITY"} on change.
+QualityTier = namedtuple("QualityTier", "name pillars tilt_step overlay_alpha fps")
+QUALITY_TIERS = (
+    QualityTier("high",    "full",     CAPY_ROT_STEP, True,  60),
+    QualityTier("medium",  "full-rle", CAPY_ROT_STEP, True,  60),
+    QualityTier("low",     "flat-rle", 6.0,           False, 60),
+    QualityTier("minimal", "flat-rle", None,          False, 30),
+)
+# Load = a frame's work as a fraction of the tier's frame period, so a lower fps (more
+# fixed steps per frame, but half the frames) reads as the lighter load it is
+QUALITY_BUDGET = 0.8        # leaves the rest of each frame to the browser
+QUALITY = QualityGovernor(len(QUALITY_TIERS), QUALITY_BUDGET)
+QUALITY_TIER = QUALITY_TIERS[0]
+PILLAR_STYLES = {"full": PILLARS}   # collision masks always use the exact full style
+PILLAR_DRAW = PILLARS
+
+def apply_quality():
+    """Switch the renderer to QUALITY.tier and tell the parent page."""
+    global QUALITY_TIER, PILLAR_DRAW
+    QUALITY_TIER = QUALITY_TIERS[QUALITY.tier]
+    look = QUALITY_TIER.pillars
+    if look not in PILLAR_STYLES:
+        style, _, enc = look.partition("-")
+        PILLAR_STYLES[look] = PillarRenderer(OBSTACLE_WIDTH, HEIGHT, style=style, rle=(enc == "rle"))
+    PILLAR_DRAW = PILLAR_STYLES[look]
+    DIRTY.invalidate()
+    IDLE.invalidate()
+    announce_quality()
+
+def announce_quality():
+    _dbg_log(QUALITY.report())
+    _post_to_parent({"type": "QUALITY", "tier": QUALITY.tier, "name": QUALITY_TIER.name,
+                     "locked": QUALITY.locked})
+
+def capy_tilt():
+    """Capybara angle for this frame at the current tier (quantized, or 0 when tilting is off)."""
+    step = QUALITY_TIER.tilt_step
+    if step is None:
+        return 0.0
+    angle = -WORLD.capy_movement * CAPY_TILT
+    return angle if step == CAPY_ROT_STEP else round(angle / step) * step
 
 # =========================
 #  HUMAN CHECK
 # =========================
-def next_challenge_increment(): return random.randint(25, 45)
-next_challenge_at = next_challenge_increment()
-
-# Bot-hardening config
-MIN_CHAR_INTERVAL = 0.12      # 120 ms between chars
-MAX_STRIKES = 3               # wrong 4-char tries allowed
-last_char_time = 0.0
-
-challenge = {
-    "code": "",
-    "typed": "",
-    "deadline": 0.0,
-    "active": False,
-    "time_limit": 15.0,   # 15 seconds
-    "strikes": 0
-}
-
 # Input rect for mobile keyboards (matches the overlay box)
 CHALLENGE_INPUT_RECT = pygame.Rect(WIDTH//2 - 130, HEIGHT//2 - 40, 260, 80)
 
-# Allowed character set (matches code generation)
-ALLOWED_CHARS = [d for d in "23456789"] + [c for c in string.ascii_uppercase if c not in ("O","I")]
-
-def random_code(n=4):
-    alphabet = [c for c in string.ascii_uppercase if c not in ("O","I")]
-    digits   = [d for d in "23456789"]
-    pool = alphabet + digits
-    return "".join(random.choice(pool) for _ in range(n))
-
-def start_challenge():
-    global game_state, challenge, spawning_enabled, keyboard_mode
-    spawning_enabled = False
-    challenge["code"] = random_code(4)
-    challenge["typed"] = ""
-    challenge["deadline"] = time.perf_counter() + challenge["time_limit"]
-    challenge["active"] = True
-    challenge["strikes"] = 0
-    keyboard_mode = "letters"  # start on letters
-
-    game_state = "challenge"
+def begin_text_input():
     # Mobile keyboards: start text input and anchor to the code box
     try:
         pygame.key.set_text_input_rect(CHALLENGE_INPUT_RECT)
@@ -667,19 +647,31 @@ def _keyboard_rows_numbers():
     disabled = set()  # all shown numbers are valid
     return rows, disabled
 
-def get_keyboard_layout():
+_KEYBOARDS = {}  # keyboard mode -> (layout, KeyGrid); the geometry never changes
+
+def get_keyboard_layout(mode=None):
     """
-    Build phone-like keyboard geometry.
-    Returns list of (label, rect, enabled, kind)
+    Phone-like keyboard geometry for 'mode' (default: the current keyboard_mode).
+    Returns list of (label, rect, enabled, kind), built once per mode; treat as read-only.
     kind in {"char","backspace","toggle","spacer"}
     """
+    return _keyboard(keyboard_mode if mode is None else mode)[0]
+
+def _keyboard(mode):
+    kb = _KEYBOARDS.get(mode)
+    if kb is None:
+        layout = _build_keyboard_layout(mode)
+        kb = _KEYBOARDS[mode] = (layout, KeyGrid(layout, WIDTH, HEIGHT))
+    return kb
+
+def _build_keyboard_layout(mode):
     pad = 6
     # available area for the keyboard (bottom ~45% of screen)
     avail_top = int(HEIGHT * 0.55)
     avail_bottom = HEIGHT - 10
 
     # Build logical rows
-    if keyboard_mode == "letters":
+    if mode == "letters":
         rows, disabled = _keyboard_rows_letters()
         bottom = [["123"], [" "], ["←"]]  # spacer in middle
     else:
@@ -720,7 +712,7 @@ def get_keyboard_layout():
                 rect = pygame.Rect(x, y, key_w, key_h)
                 kind = "char"
                 enabled = (label in ALLOWED_CHARS)
-                if keyboard_mode == "letters" and label in ("I","O"):
+                if mode == "letters" and label in ("I","O"):
                     enabled = False
                 layout.append((label, rect, enabled, kind))
                 x += key_w + pad
@@ -728,57 +720,58 @@ def get_keyboard_layout():
 
     return layout
 
-def draw_keyboard():
-    keys = get_keyboard_layout()
+def draw_keyboard(target, mode, offset=(0, 0)):
+    keys = get_keyboard_layout(mode)
     for label, rect, enabled, kind in keys:
+        rect = rect.move(-offset[0], -offset[1])
         # style
         bg = (25,25,25) if enabled or kind in ("backspace","toggle") else (15,15,15)
         border = (210,210,210) if enabled or kind in ("backspace","toggle") else (90,90,90)
-        pygame.draw.rect(SCREEN, bg, rect, border_radius=8)
-        pygame.draw.rect(SCREEN, border, rect, width=2, border_radius=8)
+        pygame.draw.rect(target, bg, rect, border_radius=8)
+        pygame.draw.rect(target, border, rect, width=2, border_radius=8)
 
         if kind == "spacer":
             continue
 
         txt_label = label
         if kind == "toggle":
-            txt_label = "123" if keyboard_mode == "letters" else "ABC"
+            txt_label = "123" if mode == "letters" else "ABC"
         elif kind == "backspace":
             txt_label = "←"
 
         color = (240,240,240) if (enabled or (kind in ("backspace","toggle"))) else (120,120,120)
-        txt = FONT.render(txt_label, True, color)
-        SCREEN.blit(txt, (rect.centerx - txt.get_width()//2, rect.centery - txt.get_height()//2))
+        txt = TEXT.render(FONT, txt_label, color)
+        target.blit(txt, (rect.centerx - txt.get_width()//2, rect.centery - txt.get_height()//2))
 
 def handle_keyboard_click(pos):
-    global keyboard_mode, last_char_time
-    keys = get_keyboard_layout()
-    for label, rect, enabled, kind in keys:
-        if rect.collidepoint(pos):
-            if kind == "toggle":
-                keyboard_mode = "numbers" if keyboard_mode == "letters" else "letters"
-                return True
-            if kind == "backspace":
-                if challenge["typed"]:
-                    challenge["typed"] = challenge["typed"][:-1]
-                return True
-            if kind == "char" and enabled and len(challenge["typed"]) < 4:
-                t = time.perf_counter()
-                if (t - last_char_time) >= MIN_CHAR_INTERVAL:
-                    challenge["typed"] += label
-                    last_char_time = t
-                return True
-            return True
-    return False
+    """Key taps become Inputs for the world (which applies the typing rate limit)."""
+    global keyboard_mode
+    key = _keyboard(keyboard_mode)[1].key_at(pos)
+    if key is None:
+        return False
+    label, rect, enabled, kind = key
+    if kind == "toggle":
+        keyboard_mode = "numbers" if keyboard_mode == "letters" else "letters"
+    elif kind == "backspace":
+        INPUTS.backspace += 1
+    elif kind == "char" and enabled:
+        INPUTS.chars.append(label)
+    return True
 
 # --- Slight anti-OCR distortion for the code text (deterministic) ---
-def draw_distorted_code(code, y, color=(255,255,255)):
+_CODE_SURF = [None, None, 0]  # (code, colour), its distorted surface, screen x; only the current code is kept
+
+def distorted_code_surface(code, color=(255,255,255)):
+    """(surface, x) of 'code' with its glyphs rotated and jittered; built once per code."""
+    key = (code, tuple(color))
+    if _CODE_SURF[0] == key:
+        return _CODE_SURF[1], _CODE_SURF[2]
     rng = random.Random(code)  # deterministic per challenge
     glyphs = []
     spacing = 6
     total_w = 0
     for ch in code:
-        surf = FONT.render(ch, True, color)
+        surf = TEXT.render(FONT, ch, color)
         angle = rng.uniform(-6, 6)   # small rotation
         rotated = pygame.transform.rotate(surf, angle)
         # tiny x jitter to break perfect alignment
@@ -786,81 +779,138 @@ def draw_distorted_code(code, y, color=(255,255,255)):
         glyphs.append((rotated, offset_x))
         total_w += rotated.get_width() + spacing
     total_w -= spacing
-    x = WIDTH//2 - total_w//2
+    # one pixel of room on each side for the jitter
+    out = pygame.Surface((max(1, total_w + 2), max([g.get_height() for g, _ in glyphs] or [1])), pygame.SRCALPHA)
+    x = 1
     for rotated, dx in glyphs:
-        SCREEN.blit(rotated, (x + dx, y))
+        out.blit(rotated, (x + dx, 0))
         x += rotated.get_width() + spacing
+    _CODE_SURF[:] = key, out, WIDTH//2 - total_w//2 - 1
+    return out, _CODE_SURF[2]
+
+def draw_distorted_code(code, y, color=(255,255,255)):
+    surf, x = distorted_code_surface(code, color)
+    DIRTY.mark(SCREEN.blit(surf, (x, y)))
 
 # =========================
 #  UI HELPERS
 # =========================
 def draw_text_center(text, size, y, color=(255,255,255)):
-    f = pygame.font.SysFont("Arial", size, bold=True)
-    s = f.render(text, True, color)
-    SCREEN.blit(s, (WIDTH//2 - s.get_width()//2, y))
+    s = TEXT.render(FONTS.get("Arial", size, bold=True), text, color)
+    DIRTY.mark(SCREEN.blit(s, (WIDTH//2 - s.get_width()//2, y)))
 
 def score_display(mode):
     if mode == "main":
-        s = FONT.render(f"Score: {int(score)}", True, (255,255,255))
-        SCREEN.blit(s, (10,10))
+        s = TEXT.render(FONT, f"Score: {int(WORLD.score)}", (255,255,255))
+        DIRTY.mark(SCREEN.blit(s, (10,10)))
     elif mode == "game_over":
-        s  = FONT.render(f"Score: {int(score)}", True, (255,255,255))
-        hs = FONT.render(f"High Score: {int(high_score)}", True, (255,255,255))
-        SCREEN.blit(s,  (WIDTH//2 - s.get_width()//2,  HEIGHT//2 - 40))
-        SCREEN.blit(hs, (WIDTH//2 - hs.get_width()//2, HEIGHT//2))
-
-def reset_game():
-    try:
-        reset_run_flag()
-    except Exception:
-        pass
-    global score_sent
-    global capy_movement, capy_y, score, obstacles, next_challenge_at, challenge, spawning_enabled, next_spacing_x, played_gameover_sound
-    capy_rect.center = (100, HEIGHT // 2)
-    capy_y = float(HEIGHT // 2)
-    capy_movement = 0.0
-    obstacles = []
-    score = 0
-    score_sent = False
-    next_challenge_at = next_challenge_increment()
-    challenge["active"] = False
-    challenge["typed"] = ""
-    challenge["code"] = ""
-    challenge["deadline"] = 0.0
-    challenge["strikes"] = 0
-    spawning_enabled = False
-    next_spacing_x = OBSTACLE_SPACING_X + random.randint(-SPACING_JITTER, SPACING_JITTER)
-    played_gameover_sound = False
-    _apply_mute_state()
+        s  = TEXT.render(FONT, f"Score: {int(WORLD.score)}", (255,255,255))
+        hs = TEXT.render(FONT, f"High Score: {int(high_score)}", (255,255,255))
+        DIRTY.mark(SCREEN.blit(s,  (WIDTH//2 - s.get_width()//2,  HEIGHT//2 - 40)))
+        DIRTY.mark(SCREEN.blit(hs, (WIDTH//2 - hs.get_width()//2, HEIGHT//2)))
+
+def on_world_event(kind, value):
+    """Side effects of gameplay events: sounds, parent messages, text input."""
+    global played_gameover_sound, score_sent, high_score, keyboard_mode
+    if kind == "run_start":
+        try:
+            notify_run_start()
+        except Exception:
+            pass
+    elif kind == "score":
+        try:
+            notify_checkpoint(value)
+        except Exception:
+            pass
+        if SOUND_ENABLED and (not is_muted) and SFX_REWARD:
+            try:
+                SFX_REWARD.play()
+            except:
+                pass
+    elif kind == "challenge":
+        keyboard_mode = "letters"  # start on letters
+        begin_text_input()
+    elif kind == "challenge_passed":
+        try: pygame.key.stop_text_input()
+        except Exception: pass
+    elif kind == "gameover":
+        try: pygame.key.stop_text_input()
+        except Exception: pass
+        if value > high_score:
+            high_score = value
+        if not score_sent:
+            try:
+                # replays re-simulate with hitbox rects; mask-mode runs don't send one
+                notify_score(value, WORLD.last_replay if WORLD.collider is None else None)
+            except Exception:
+                pass
+            score_sent = True
+        if SOUND_ENABLED and (not is_muted) and SFX_GAMEOVER:
+            if not played_gameover_sound:
+                try: SFX_GAMEOVER.play()
+                except: pass
+                played_gameover_sound = True
+    elif kind == "reset":
+        try:
+            reset_run_flag()
+        except Exception:
+            pass
+        score_sent = False
+        played_gameover_sound = False
+        _apply_mute_state()
 
-def enter_play():
-    global game_state, spawning_enabled, next_spacing_x, capy_y
-    game_state = "play"; spawning_enabled = True
-    next_spacing_x = OBSTACLE_SPACING_X + random.randint(-SPACING_JITTER, SPACING_JITTER)
-    # Sync float position to current sprite position to avoid a jump
-    capy_y = float(capy_rect.centery)
+_CHALLENGE_DIMS = {}     # see-through? -> full-screen layer: dim (or opaque backdrop) + empty code box
+_KEYBOARD_LAYERS = {}    # keyboard mode -> (rendered keys, top-left); transparent between keys
+_TYPED_LABEL = [None, None]         # typed text, its surface
+_TIMER_LABEL = [None, None, None]   # tenths of a second shown, urgent colour?, surface
+
+def _challenge_dim(see_through=True):
+    layer = _CHALLENGE_DIMS.get(see_through)
+    if layer is None:
+        if see_through:
+            layer = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            layer.fill((0,0,0,160))
+        else:
+            layer = pygame.Surface((WIDTH, HEIGHT))   # plain copy, no blending
+            layer.fill((12,12,16))
+        pygame.draw.rect(layer, (30,30,30), CHALLENGE_INPUT_RECT, border_radius=10)
+        pygame.draw.rect(layer, (200,180,90), CHALLENGE_INPUT_RECT, width=3, border_radius=10)
+        _CHALLENGE_DIMS[see_through] = layer
+    return layer
+
+def _keyboard_layer(mode):
+    kl = _KEYBOARD_LAYERS.get(mode)
+    if kl is None:
+        keys = get_keyboard_layout(mode)
+        area = keys[0][1].unionall([rect for _, rect, _, _ in keys])
+        layer = pygame.Surface(area.size, pygame.SRCALPHA)
+        draw_keyboard(layer, mode, offset=area.topleft)
+        kl = _KEYBOARD_LAYERS[mode] = (layer, area.topleft)
+    return kl
 
 def draw_challenge_overlay():
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0,0,0,160)); SCREEN.blit(overlay, (0,0))
+    """Cached layers + code surface; only the typed text and the timer are re-rendered, on change."""
+    box_rect = CHALLENGE_INPUT_RECT
+    DIRTY.mark(SCREEN.blit(_challenge_dim(QUALITY_TIER.overlay_alpha), (0, 0)))
     draw_text_center("Quick Check!", 34, int(HEIGHT*0.22), (255,215,120))
     draw_text_center("Type this code to continue", 20, int(HEIGHT*0.32), (230,230,230))
-    code = challenge["code"]; typed = challenge["typed"]
-    box_w, box_h = 260, 80
-    box_rect = pygame.Rect(WIDTH//2 - box_w//2, HEIGHT//2 - box_h//2, box_w, box_h)
-    pygame.draw.rect(SCREEN, (30,30,30), box_rect, border_radius=10)
-    pygame.draw.rect(SCREEN, (200,180,90), box_rect, width=3, border_radius=10)
     # Distorted code (anti-OCR) — centered
-    draw_distorted_code(code, box_rect.y + 8, (255,255,255))
-    typed_font = pygame.font.SysFont("Arial", 26)
-    typed_surf = typed_font.render(typed or " ", True, (180,220,255))
-    SCREEN.blit(typed_surf, (WIDTH//2 - typed_surf.get_width()//2, box_rect.y+46))
-    remaining = max(0.0, challenge["deadline"] - time.perf_counter())
-    timer_font = pygame.font.SysFont("Arial", 20)
-    timer_surf = timer_font.render(f"{remaining:.1f}s", True, (255,200,200) if remaining<3 else (200,255,200))
-    SCREEN.blit(timer_surf, (WIDTH//2 - timer_surf.get_width()//2, int(HEIGHT*0.72)))
-    # On-screen keyboard (mobile-friendly)
-    draw_keyboard()
+    draw_distorted_code(WORLD.challenge["code"], box_rect.y + 8, (255,255,255))
+    typed = WORLD.challenge["typed"]
+    if typed != _TYPED_LABEL[0]:
+        _TYPED_LABEL[:] = typed, TEXT.render(FONTS.get("Arial", 26), typed or " ", (180,220,255))
+    typed_surf = _TYPED_LABEL[1]
+    DIRTY.mark(SCREEN.blit(typed_surf, (WIDTH//2 - typed_surf.get_width()//2, box_rect.y+46)))
+    remaining = WORLD.challenge_remaining()
+    tenths = int(remaining * 10 + 0.5); urgent = remaining < 3
+    if tenths != _TIMER_LABEL[0] or urgent != _TIMER_LABEL[1]:
+        _TIMER_LABEL[:] = tenths, urgent, TEXT.render(FONTS.get("Arial", 20), f"{tenths / 10:.1f}s",
+                                                      (255,200,200) if urgent else (200,255,200))
+    timer_surf = _TIMER_LABEL[2]
+    DIRTY.mark(SCREEN.blit(timer_surf, (WIDTH//2 - timer_surf.get_width()//2, int(HEIGHT*0.72))))
+    # On-screen keyboard (mobile-friendly), over the timer as it always was
+    layer, pos = _keyboard_layer(keyboard_mode)
+    DIRTY.mark(SCREEN.blit(layer, pos))
 
 # =========================
 #  MAIN LOOP
@@ -871,250 +921,364 @@ last_time = time.perf_counter()
 was_window_active = pygame.display.get_active()
 resume_unignore_until = 0.0  # perf_counter() timestamp; ignore flaps until this
 
-while True:
-    now = time.perf_counter()
-    dt = now - last_time
-    last_time = now
-    dt = max(0.0, min(dt, 0.10))
-    # NEW: keep high_score synced from parent (Supabase value)
-    _poll_parent_best()
-    game_active = (game_state == "play")
-    paused_for_focus = game_active and (not pygame.display.get_active())
-
-    # Detect tab/window resume and guard against queued input bursts
-    window_active = pygame.display.get_active()
-    if was_window_active is False and window_active is True:
-        # Clear any queued clicks/keys that arrived while backgrounded
-        try:
-            pygame.event.clear([pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.TEXTINPUT])
-        except Exception:
-            pass
-        # Ignore flaps for a short grace period after resume
-        resume_unignore_until = time.perf_counter() + 0.15  # 150 ms
+def event_time(event):
+    """perf_counter() time the event arrived, or None when unknown: IDLE.wait() stamps what it
+    takes during the desktop frame wait; on web events only show up at the next poll."""
+    return getattr(event, "t", None)
 
+def queue_flap(event):
+    """Queue a gameplay tap for its simulation step (unless inside the resume grace period)."""
+    t_in = event_time(event)
+    seen = time.perf_counter() if t_in is None else t_in
+    if seen < resume_unignore_until:
+        return
+    maybe_start_music()
+    FLAPS.push(t_in)
+    FRAMES.input_handled(seen)
+
+_TASKS = set()
+
+def start_task(coro):
+    """Run 'coro' cooperatively beside the frame loop (keeps a reference until it finishes)."""
+    task = asyncio.get_event_loop().create_task(coro)
+    _TASKS.add(task)
+    task.add_done_callback(_TASKS.discard)
+    return task
+
+# On web the browser paces frames (one per animation callback); desktop caps at 60
+FRAME_CAP = 0 if IS_WEB else 60
+FRAMES = FrameStats()
+FRAME_STATS_EVERY = 600  # frames between jitter/latency log lines
+
+# Static screens (title, ready, game over, paused) only redraw the bobbing capybara, and a
+# hidden window stops presenting and idles at IDLE_FPS until input arrives. CAPY_IDLE_SAVER=0 disables.
+IDLE_FPS = 4
+IDLE = IdleScheduler(IDLE_FPS, enabled=os.environ.get("CAPY_IDLE_SAVER", "1") == "1", can_block=not IS_WEB)
+
+def idle_scene(paused_for_focus):
+    """Key of everything on screen except the bobbing capybara; None while the screen is busy."""
+    state = WORLD.state
+    if PROFILER.enabled:
+        return None
+    if state in ("start", "ready"):
+        return (state, WORLD.seed, WORLD.score, high_score, is_muted)
+    if state == "gameover":
+        return (state, WORLD.seed, WORLD.score, high_score, is_muted,
+                WORLD.time - WORLD.gameover_time > 1)  # "try again" line shown
+    if state == "play" and paused_for_focus:
+        return ("paused", WORLD.seed, WORLD.steps, high_score, is_muted, parent_paused)
+    return None
 
-    for event in pygame.event.get():
-        # --- MUTE BUTTON CLICK: consume the event so it doesn't trigger game actions ---
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if _point_in(mute_button_rect, event.pos):
-                is_muted = not is_muted
-                _apply_mute_state()
-                maybe_start_music()  # if first tap is the mute, allow music later
-                continue  # DO NOT propagate to gameplay click handling
-
-        # Mobile/desktop: hotkey to toggle mute (disabled during challenge so typing 'M' doesn't mute)
-        if event.type == pygame.KEYDOWN and event.key == pygame.K_m and game_state != "challenge":
-            is_muted = not is_muted
-            _apply_mute_state()
-            continue
-
-        if event.type == pygame.QUIT:
-            pygame.quit(); sys.exit()
-
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                pygame.quit(); sys.exit()
-
-            if game_state in ("start","ready"):
-                if event.key in (pygame.K_SPACE, pygame.K_RETURN):
-                    maybe_start_music()
-                    try:
-                        notify_run_start()
-                    except Exception:
-                        pass
-                    enter_play()
-
-            elif game_state == "play":
-                if not paused_for_focus and event.key == pygame.K_SPACE:
-                    if time.perf_counter() >= resume_unignore_until:
-                        maybe_start_music()
-                        try_flap()
-                    continue
+def idle_region():
+    """The animated sprite on a static screen: the capybara bobbing on title/ready."""
+    if WORLD.state in ("start", "ready"):
+        return capy_img.get_rect(center=WORLD.capy_rect.center)
+    return None
 
+# Frame profiler HUD: F3, CAPY_PROFILER=1 or window.__capy_profiler from the parent page
+# "parent" covers both the inbox drain and the outbox flush
+PROFILE_PHASES = ("events", "parent", "physics", "obstacles", "collision", "draw", "hud", "present", "tick")
+PROFILE_BUDGET = 1.5 / 60   # a frame this long has missed a 60 Hz vsync; flagged red
+PROFILER = FrameProfiler(PROFILE_PHASES, budget=PROFILE_BUDGET)
+PROFILE_FONT = FONTS.get("Arial", 12)
+PROFILE_POS = (6, 50)  # under the score
+
+def set_profiler(enabled):
+    if enabled != PROFILER.enabled:
+        PROFILER.toggle()
+    # the world only pays for lap() calls while the HUD is on
+    WORLD.profiler = PROFILER if PROFILER.enabled else None
+    DIRTY.invalidate()
+
+set_profiler(_flag("CAPY_PROFILER", "__capy_profiler"))
+
+parent_paused = False  # SET_PAUSED from the parent page (e.g. while it shows a modal)
+
+def set_quality(value):
+    """"auto" (or None) lets the governor decide; a tier name or index pins that tier."""
+    names = [t.name for t in QUALITY_TIERS]
+    if value is None or value == "auto":
+        QUALITY.lock(None)
+    else:
+        QUALITY.lock(names.index(value) if value in names else int(value))
+    apply_quality()
+
+# CAPY_QUALITY=<tier name or index> pins a tier from the start (testing, benchmarks)
+if os.environ.get("CAPY_QUALITY"):
+    set_quality(os.environ["CAPY_QUALITY"])
+
+def handle_parent_messages():
+    """Apply what the parent page pushed since the last frame; free when nothing arrived."""
+    global high_score, is_muted, parent_paused
+    for msg in INBOX.drain():
+        kind = msg.get("type")
+        try:
+            if kind == "SET_MY_BEST":
+                high_score = max(high_score, int(msg.get("best") or 0))
+            elif kind == "SET_MUTE":
+                muted = bool(msg.get("muted"))
+                if muted != is_muted:
+                    is_muted = muted
+                    _apply_mute_state()
+            elif kind == "SET_PAUSED":
+                parent_paused = bool(msg.get("paused"))
+            elif kind == "SET_CONFIG":
+                if "profiler" in msg:
+                    set_profiler(bool(msg["profiler"]))
+                if "quality" in msg:
+                    set_quality(msg["quality"])
+        except (TypeError, ValueError):
+            pass
 
-            elif game_state == "challenge":
-                # BACKSPACE still arrives as KEYDOWN on soft keyboards / desktop
-                if event.key == pygame.K_BACKSPACE:
-                    if challenge["typed"]:
-                        challenge["typed"] = challenge["typed"][:-1]
-
-            elif game_state == "gameover":
-                if time.time() - gameover_time > 1 and event.key in (pygame.K_r, pygame.K_SPACE):
-                    reset_game(); game_state = "ready"
-
-        # TEXTINPUT: soft keyboard characters for mobile / desktop IME
-        if event.type == pygame.TEXTINPUT and game_state == "challenge":
-            ch = event.text.upper()
-            t = time.perf_counter()
-            if ch in ALLOWED_CHARS:
-                if (t - last_char_time) >= MIN_CHAR_INTERVAL and len(challenge["typed"]) < 4:
-                    challenge["typed"] = (challenge["typed"] + ch)
-                    last_char_time = t
-            continue
+def render_frame(paused_for_focus=False):
+    """Draw the current world state (everything between DIRTY.begin() and DIRTY.present())."""
+    game_state = WORLD.state
+    capy_center = WORLD.capy_rect.center
 
-        # Normal gameplay click handling (after consuming mute click above)
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if game_state == "challenge":
-                # On-screen phone keyboard tap?
-                if handle_keyboard_click(event.pos):
-                    maybe_start_music()  # harmless
-                    continue
-                # If user taps the code box, re-focus text input on mobile
-                if CHALLENGE_INPUT_RECT.collidepoint(event.pos):
-                    try:
-                        pygame.key.set_text_input_rect(CHALLENGE_INPUT_RECT)
-                        pygame.key.start_text_input()
-                    except Exception:
-                        pass
-
-            if game_state in ("start","ready"):
-                maybe_start_music()
-                try:
-                    notify_run_start()
-                except Exception:
-                    pass
-                enter_play()
-            elif game_state == "play" and not paused_for_focus:
-                if time.perf_counter() >= resume_unignore_until:
-                    maybe_start_music()
-                    try_flap()
-                continue
-            elif game_state == "gameover":
-                if time.time() - gameover_time > 1:
-                    reset_game(); game_state = "ready"
-
-    # Background
-    SCREEN.blit(background_img, (0, 0))
+    # Background (full blit, or only last frame's dirty rects in dirty-rect mode)
+    DIRTY.begin()
     # (draw other things; mute button will be drawn last)
 
     if game_state == "start":
-        capy_rect.centery = int(HEIGHT*0.55 + 8*math.sin(pygame.time.get_ticks()*0.005))
-        SCREEN.blit(capy_img, capy_img.get_rect(center=capy_rect.center))
+        DIRTY.mark(SCREEN.blit(capy_img, capy_img.get_rect(center=capy_center)))
         draw_text_center("Flappy Capy", 40, HEIGHT//4)
         draw_text_center("Press SPACE or TAP to Start", 22, HEIGHT//2)
             # Show version only on the start screen (bottom-right corner)
-        _ver = VERSION_FONT.render(GAME_VERSION, True, (200, 200, 200))
-        SCREEN.blit(_ver, (WIDTH - _ver.get_width() - 6, HEIGHT - _ver.get_height() - 6))
+        _ver = TEXT.render(VERSION_FONT, GAME_VERSION, (200, 200, 200))
+        DIRTY.mark(SCREEN.blit(_ver, (WIDTH - _ver.get_width() - 6, HEIGHT - _ver.get_height() - 6)))
 
 
     elif game_state == "ready":
-        capy_rect.centery = int(HEIGHT*0.55 + 8*math.sin(pygame.time.get_ticks()*0.005))
-        SCREEN.blit(capy_img, capy_img.get_rect(center=capy_rect.center))
+        DIRTY.mark(SCREEN.blit(capy_img, capy_img.get_rect(center=capy_center)))
         draw_obstacles()
         draw_text_center("Get Ready!", 36, HEIGHT//4)
         draw_text_center("Press SPACE or TAP to continue", 22, HEIGHT//2)
         score_display("main")
 
     elif game_state == "play" and not paused_for_focus:
-        # time-based physics
-        capy_movement += GRAVITY * dt                # v += a*dt
-        capy_y += capy_movement * dt                 # y += v*dt
-        capy_rect.centery = int(capy_y)              # assign int to Rect
-        capy_angle = -capy_movement * 0.05           # degrees; tuned to feel like before
-        capy_rotated = pygame.transform.rotate(capy_img, capy_angle)
-        SCREEN.blit(capy_rotated, capy_rotated.get_rect(center=capy_rect.center))
-
-        obstacles[:] = update_obstacles(dt)
-        maybe_spawn_by_distance()
-        draw_obstacles()
-
-        if not check_collision_single_column():
-            game_state = "gameover"; gameover_time = time.time(); spawning_enabled = False
-            if not score_sent:
-                try:
-                    notify_score(score)
-                except Exception:
-                    pass
-                score_sent = True
-            if SOUND_ENABLED and (not is_muted) and SFX_GAMEOVER:
-                if not played_gameover_sound:
-                    try: SFX_GAMEOVER.play()
-                    except: pass
-                    played_gameover_sound = True
-
-        for ob in obstacles:
-            if (not ob["scored"]) and (ob["x"]+OBSTACLE_WIDTH) < capy_rect.left:
-                score += 1
-                ob["scored"] = True
-                try:
-                    notify_checkpoint(score)
-                except Exception:
-                    pass
-                if SOUND_ENABLED and (not is_muted) and SFX_REWARD:
-                    try:
-                        SFX_REWARD.play()
-                    except:
-                        pass
-
-
-
-        if score >= next_challenge_at: start_challenge()
+        # rendered between the last two simulation steps
+        alpha = SIM.alpha
+        draw_y = int(WORLD.prev_capy_y + (WORLD.capy_y - WORLD.prev_capy_y) * alpha)
+        DIRTY.mark(CAPY_ROT.blit(SCREEN, capy_tilt(), (capy_center[0], draw_y)))
+        draw_obstacles(alpha)
         score_display("main")
 
     elif game_state == "play" and paused_for_focus:
-        draw_obstacles(); SCREEN.blit(capy_img, capy_img.get_rect(center=capy_rect.center))
+        draw_obstacles(); DIRTY.mark(SCREEN.blit(capy_img, capy_img.get_rect(center=capy_center)))
         score_display("main")
-        draw_text_center("Paused (click tab to return)", 20, int(HEIGHT*0.15), (200,200,200))
+        label = "Paused" if parent_paused else "Paused (click tab to return)"
+        draw_text_center(label, 20, int(HEIGHT*0.15), (200,200,200))
 
     elif game_state == "challenge":
-        # Wrong full entry -> strike
-        if len(challenge["typed"]) == 4 and challenge["typed"] != challenge["code"]:
-            challenge["strikes"] += 1
-            challenge["typed"] = ""
-
         draw_obstacles()
-        SCREEN.blit(capy_img, capy_img.get_rect(center=capy_rect.center))
+        DIRTY.mark(SCREEN.blit(capy_img, capy_img.get_rect(center=capy_center)))
         score_display("main")
         draw_challenge_overlay()
 
-        # Success
-        if challenge["typed"] == challenge["code"]:
-            try: pygame.key.stop_text_input()
-            except Exception: pass
-            challenge["active"] = False
-            game_state = "ready"
-            challenge["typed"] = ""
-            challenge["code"] = ""
-            challenge["deadline"] = 0.0
-            challenge["strikes"] = 0
-            obstacles.clear()
-            capy_movement = 0.0
-            next_spacing_x = OBSTACLE_SPACING_X + random.randint(-SPACING_JITTER, SPACING_JITTER)
-            next_challenge_at = score + next_challenge_increment()
-            spawning_enabled = False
-
-        # Out of time or too many strikes -> game over
-        elif time.perf_counter() > challenge["deadline"] or challenge["strikes"] >= MAX_STRIKES:
-            try: pygame.key.stop_text_input()
-            except Exception: pass
-            game_state = "gameover"
-            gameover_time = time.time()
-            spawning_enabled = False
-            if not score_sent:
-                try:
-                    notify_score(score)
-                except Exception:
-                    pass
-                score_sent = True
-            if SOUND_ENABLED and (not is_muted) and SFX_GAMEOVER:
-                if not played_gameover_sound:
-                    try: SFX_GAMEOVER.play()
-                    except: pass
-                    played_gameover_sound = True
-
     else:  # gameover
         draw_obstacles()
-        SCREEN.blit(capy_img, capy_img.get_rect(center=capy_rect.center))
-        if score > high_score:
-            high_score = score
+        DIRTY.mark(SCREEN.blit(capy_img, capy_img.get_rect(center=capy_center)))
         draw_text_center("Game Over!", 42, HEIGHT//4, (255,80,80))
         score_display("game_over")
-        if time.time() - gameover_time > 1:
+        if WORLD.time - WORLD.gameover_time > 1:
             draw_text_center("Press R / Tap to Try Again", 22, int(HEIGHT*0.68))
 
     # --- Draw the mute button LAST so it stays on top of pillars/overlays ---
     draw_mute_button()
 
-    was_window_active = window_active
-    pygame.display.update()
-    CLOCK.tick(60)
+# The human check counts down in simulated time (replays stay exact), so while it is up the
+# simulation keeps pace with the wall clock: no catch-up cap or 0.25 s clamp, and an idle
+# (IDLE_FPS) or hidden window cannot stretch its time limit. Challenge steps cost next to
+# nothing; one frame never needs more than a whole limit's worth of them.
+CHALLENGE_MAX_STEPS = int(CHALLENGE_TIME_LIMIT * SIM_HZ) + 1
+
+def simulate(frame_dt, now, paused_for_focus):
+    """
+    Run the fixed steps due after 'frame_dt' seconds. Pending inputs go to the first
+    step, taps to the step covering their time (step k of n stands for 'now' minus the
+    n-1-k steps after it, so a tap polled this frame always lands this frame).
+    """
+    if paused_for_focus:
+        SIM.reset()
+        FLAPS.clear()
+        return
+    if WORLD.state == "challenge":
+        steps = SIM.advance(max(0.0, frame_dt), CHALLENGE_MAX_STEPS)
+    else:
+        steps = SIM.advance(max(0.0, min(frame_dt, 0.25)))
+    for k in range(steps):
+        if FLAPS.due(now - (steps - 1 - k) * SIM.dt):
+            INPUTS.flap = True
+        WORLD.step(SIM.dt, INPUTS)
+        INPUTS.clear()
+    if WORLD.state != "play":
+        FLAPS.clear()
+
+async def main():
+    global last_time, was_window_active, resume_unignore_until, is_muted
+
+    # Load sounds and pre-rotate sprites in the background (audio reloaded by hard_resume_audio on iOS if needed)
+    start_task(load_audio_assets_async())
+    start_task(warm_rotations())
+    frame_no = 0
+    last_present = 0.0
+
+    while True:
+        PROFILER.begin()
+        now = time.perf_counter()
+        frame_dt = now - last_time
+        last_time = now
+        # best score / mute / pause / config pushed by the parent page
+        handle_parent_messages()
+        PROFILER.lap("parent")
+        game_state = WORLD.state
+        game_active = (game_state == "play")
+        paused_for_focus = game_active and (parent_paused or not pygame.display.get_active())
+
+        # Detect tab/window resume and guard against queued input bursts
+        window_active = pygame.display.get_active()
+        if was_window_active is False and window_active is True:
+            # Clear any queued clicks/keys that arrived while backgrounded
+            try:
+                pygame.event.clear([pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.TEXTINPUT])
+            except Exception:
+                pass
+            IDLE.discard_events((pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.TEXTINPUT))
+            FLAPS.clear()
+            # Ignore flaps for a short grace period after resume
+            resume_unignore_until = time.perf_counter() + 0.15  # 150 ms
+
+
+        # events the last frame wait took as they arrived (stamped), then the rest of the queue
+        events = pygame.event.get()
+        taken = IDLE.take_events()
+        if taken:
+            events = taken + events
+        for event in events:
+            # --- MUTE BUTTON CLICK: consume the event so it doesn't trigger game actions ---
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if _point_in(mute_button_rect, event.pos):
+                    is_muted = not is_muted
+                    _apply_mute_state()
+                    maybe_start_music()  # if first tap is the mute, allow music later
+                    continue  # DO NOT propagate to gameplay click handling
+
+            # F3: frame profiler HUD
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                set_profiler(not PROFILER.enabled)
+                continue
+
+            # Mobile/desktop: hotkey to toggle mute (disabled during challenge so typing 'M' doesn't mute)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_m and game_state != "challenge":
+                is_muted = not is_muted
+                _apply_mute_state()
+                continue
+
+            if event.type == pygame.QUIT:
+                pygame.quit(); sys.exit()
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    pygame.quit(); sys.exit()
+
+                if game_state in ("start","ready"):
+                    if event.key in (pygame.K_SPACE, pygame.K_RETURN):
+                        maybe_start_music()
+                        INPUTS.start = True
+
+                elif game_state == "play":
+                    if not paused_for_focus and event.key == pygame.K_SPACE:
+                        queue_flap(event)
+                        continue
+
+
+                elif game_state == "challenge":
+                    # BACKSPACE still arrives as KEYDOWN on soft keyboards / desktop
+                    if event.key == pygame.K_BACKSPACE:
+                        INPUTS.backspace += 1
+
+                elif game_state == "gameover":
+                    if event.key in (pygame.K_r, pygame.K_SPACE):
+                        INPUTS.restart = True
+
+            # TEXTINPUT: soft keyboard characters for mobile / desktop IME
+            if event.type == pygame.TEXTINPUT and game_state == "challenge":
+                INPUTS.chars.extend(event.text.upper())
+                continue
+
+            # Normal gameplay click handling (after consuming mute click above)
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if game_state == "challenge":
+                    # On-screen phone keyboard tap?
+                    if handle_keyboard_click(event.pos):
+                        maybe_start_music()  # harmless
+                        continue
+                    # If user taps the code box, re-focus text input on mobile
+                    if CHALLENGE_INPUT_RECT.collidepoint(event.pos):
+                        begin_text_input()
+
+                if game_state in ("start","ready"):
+                    maybe_start_music()
+                    INPUTS.start = True
+                elif game_state == "play" and not paused_for_focus:
+                    queue_flap(event)
+                    continue
+                elif game_state == "gameover":
+                    INPUTS.restart = True
+
+        PROFILER.lap("events")
+
+        simulate(frame_dt, now, paused_for_focus)
+        for kind, value in WORLD.drain_events():
+            on_world_event(kind, value)
+        PROFILER.lap("physics")
+        scene = idle_scene(paused_for_focus)
+        if IS_WEB and QUALITY_TIER.fps < 60 and now - last_present < 1.0 / QUALITY_TIER.fps - 0.004:
+            frame_mode = SKIP   # the browser paces at its own rate; draw every other frame instead
+        else:
+            frame_mode = IDLE.plan(window_active, scene, idle_region())
+        if frame_mode != SKIP:
+            if frame_mode == REGION:
+                SCREEN.set_clip(IDLE.rect)
+            render_frame(paused_for_focus)
+            PROFILER.lap("draw")
+            DIRTY.mark(PROFILER.draw(SCREEN, PROFILE_FONT, PROFILE_POS))
+            PROFILER.lap("hud")
+
+        if window_active != was_window_active:
+            DIRTY.invalidate()
+        was_window_active = window_active
+        if frame_mode == FULL:
+            DIRTY.present()
+        elif frame_mode == REGION:
+            SCREEN.set_clip(None)
+            DIRTY.present_region(IDLE.rect)
+        PROFILER.lap("present")
+        OUTBOX.flush()
+        PROFILER.lap("parent")
+        if frame_mode != SKIP:
+            last_present = time.perf_counter()
+            FRAMES.presented(last_present)
+            # only busy screens (play, challenge) say anything about the device
+            busy = WORLD.state in ("play", "challenge") and not paused_for_focus
+            if busy and frame_mode == FULL and QUALITY.sample((last_present - now) * QUALITY_TIER.fps):
+                apply_quality()
+        frame_no += 1
+        if frame_no == 1:
+            LOADER.mark_ready("first_frame")
+            _dbg_log(LOADER.report())
+            announce_quality()
+        if frame_no % FRAME_STATS_EVERY == 0:
+            _dbg_log(FRAMES.summary())
+            _dbg_log(IDLE.report())
+            _dbg_log(QUALITY.report())
+            if PROFILER.enabled:
+                _dbg_log(PROFILER.summary())
+        IDLE.wait(CLOCK, min(FRAME_CAP, QUALITY_TIER.fps) if FRAME_CAP else 0)
+        await asyncio.sleep(0)  # hand control back to the browser / other tasks
+        PROFILER.lap("tick")
+        PROFILER.end()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+# =========================
+#  PIXEL COLLISION
+# =========================
+import pygame
+
+
+class MaskCollider:
+    """
+    Pixel-accurate capybara vs pillar test with pygame.mask.
+
+    The capybara mask comes from the same quantized rotation the renderer
+    draws ('rotations', a sprites.RotationTable; angle = -velocity * tilt),
+    built once per table entry together with its opaque bounding box.
+    Pillar sections are drawn by 'pillars' (pillars.PillarRenderer) the same
+    way whatever their y, so one mask per section height covers every gap
+    geometry. collides() only asks masks when the capybara's opaque box
+    overlaps a pillar section, so a frame with nothing nearby costs about as
+    much as the hitbox-rect test.
+    """
+
+    def __init__(self, rotations, tilt, pillars, threshold=127):
+        self.rotations = rotations
+        self.tilt = tilt
+        self.pillars = pillars
+        self.threshold = threshold
+        self._capy = [None] * rotations.count   # (mask, dx, dy, opaque box) per angle
+        self._sections = {}                     # section height -> mask
+        self.mask_tests = 0
+
+    def capy_entry(self, i):
+        e = self._capy[i]
+        if e is None:
+            surf, (dx, dy) = self.rotations.entry(i)
+            mask = pygame.mask.from_surface(surf, self.threshold)
+            rects = mask.get_bounding_rects()
+            box = rects[0].unionall(rects[1:]) if rects else pygame.Rect(0, 0, 0, 0)
+            e = self._capy[i] = (mask, dx, dy, box)
+        return e
+
+    def section_mask(self, h):
+        m = self._sections.get(h)
+        if m is None:
+            surf = pygame.Surface((self.pillars.width, h), pygame.SRCALPHA)
+            self.pillars.draw_section(surf, 0, 0, h)
+            m = self._sections[h] = pygame.mask.from_surface(surf, self.threshold)
+        return m
+
+    def warm_steps(self, batch=8):
+        """Builds the capybara masks, 'batch' per step (for background loading)."""
+        for i in range(self.rotations.count):
+            self.capy_entry(i)
+            if i % batch == batch - 1:
+                yield
+
+    def collides(self, cx, cy, velocity, pool):
+        """True when the capybara centred at (cx, cy) overlaps any pillar in 'pool' (x-ordered)."""
+        mask, dx, dy, box = self.capy_entry(self.rotations.index(-velocity * self.tilt))
+        ox = cx + dx; oy = cy + dy          # sprite top-left on screen
+        left = ox + box.x; right = left + box.w
+        top = oy + box.y; bottom = top + box.h
+        width = self.pillars.width
+        height = self.pillars.height
+        slots = pool.slots; cap = len(slots)
+        i = pool.head
+        for _ in range(pool.count):
+            ob = slots[i]
+            i += 1
+            if i == cap: i = 0
+            px = int(ob.x)
+            if px + width <= left: continue
+            if px >= right: break
+            half = ob.gap_size // 2
+            gap_top = max(0, ob.gap_y - half)
+            gap_bot = min(height, ob.gap_y + half)
+            if gap_top > 0 and top < gap_top:
+                self.mask_tests += 1
+                if mask.overlap(self.section_mask(gap_top), (px - ox, -oy)) is not None:
+                    return True
+            if gap_bot < height and bottom > gap_bot:
+                self.mask_tests += 1
+                if mask.overlap(self.section_mask(height - gap_bot), (px - ox, gap_bot - oy)) is not None:
+                    return True
+        return False
+
+    def report(self):
+        built = sum(1 for e in self._capy if e is not None)
+        return (f"mask collider: {built}/{len(self._capy)} capy masks, "
+                f"{len(self._sections)} pillar section masks, {self.mask_tests} mask tests")
@@ -0,0 +1,125 @@
+# =========================
+#  OBSTACLE POOL
+# =========================
+import pygame
+
+
+class Obstacle:
+    """
+    One pillar: 'x' now, 'px' one step ago (for interpolation), and its gap.
+    'top'/'bottom' are its hitboxes, sized at spawn; their x is only moved
+    (ObstaclePool.hitboxes) when a collision test actually needs them.
+    """
+    __slots__ = ("x", "px", "gap_y", "gap_size", "top", "bottom")
+
+    def __init__(self):
+        self.x = self.px = 0.0
+        self.gap_y = self.gap_size = 0
+        self.top = pygame.Rect(0, 0, 0, 0)
+        self.bottom = pygame.Rect(0, 0, 0, 0)
+
+
+class ObstaclePool:
+    """
+    Live pillars in spawn order, kept in a ring of preallocated Obstacle records.
+
+    spawn() fills the slot after the newest pillar and retire_front() drops the
+    oldest, both O(1) and without allocating; records are reused, so callers
+    update them in place (advance()). Pillars only ever scroll left together,
+    so they leave and get scored front to back: 'scored' counts the oldest
+    pillars already scored and next_unscored() is the one after them.
+    The ring doubles (the only allocation) if ever more than 'capacity' are live.
+
+    Hitboxes are 'hit_w' wide, 'hit_inset' in from the pillar's left edge, and
+    span a column 'height' tall above and below the gap.
+    """
+
+    def __init__(self, capacity=8, hit_inset=0, hit_w=1, height=0):
+        self.hit_inset = hit_inset
+        self.hit_w = hit_w
+        self.height = height
+        self.slots = [Obstacle() for _ in range(capacity)]
+        self.head = 0       # slot of the oldest live pillar
+        self.count = 0
+        self.scored = 0     # oldest 'scored' pillars have been scored
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __getitem__(self, i):
+        """i-th live pillar, oldest first (negative i counts from the newest)."""
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("obstacle index out of range")
+        return self.slots[(self.head + i) % len(self.slots)]
+
+    def __iter__(self):
+        slots = self.slots
+        cap = len(slots)
+        for i in range(self.count):
+            yield slots[(self.head + i) % cap]
+
+    def first(self):
+        return self.slots[self.head] if self.count else None
+
+    def last(self):
+        return self.slots[(self.head + self.count - 1) % len(self.slots)] if self.count else None
+
+    def clear(self):
+        self.head = self.count = self.scored = 0
+
+    def spawn(self, x, gap_y, gap_size):
+        if self.count == len(self.slots):
+            self._grow()
+        ob = self.slots[(self.head + self.count) % len(self.slots)]
+        ob.x = ob.px = x
+        ob.gap_y = gap_y
+        ob.gap_size = gap_size
+        half = gap_size // 2
+        ob.top.update(0, 0, self.hit_w, gap_y - half)
+        ob.bottom.update(0, gap_y + half, self.hit_w, self.height - (gap_y + half))
+        self.count += 1
+        return ob
+
+    def hitboxes(self, ob):
+        """(top, bottom) hitboxes of 'ob', moved to its current x."""
+        x = int(ob.x) + self.hit_inset
+        ob.top.x = x
+        ob.bottom.x = x
+        return ob.top, ob.bottom
+
+    def retire_front(self):
+        self.head = (self.head + 1) % len(self.slots)
+        self.count -= 1
+        if self.scored:
+            self.scored -= 1
+
+    def advance(self, dx):
+        """Move every pillar left by 'dx', in place."""
+        slots = self.slots
+        cap = len(slots)
+        i = self.head
+        for _ in range(self.count):
+            ob = slots[i]
+            ob.px = ob.x
+            ob.x -= dx
+            i += 1
+            if i == cap:
+                i = 0
+
+    def next_unscored(self):
+        if self.scored < self.count:
+            return self.slots[(self.head + self.scored) % len(self.slots)]
+        return None
+
+    def mark_scored(self):
+        self.scored += 1
+
+    def _grow(self):
+        live = list(self)
+        self.slots = live + [Obstacle() for _ in range(len(self.slots))]
+        self.head = 0
@@ -0,0 +1,104 @@
+# =========================
+#  PARENT-PAGE OUTBOX
+# =========================
+import json
+import time
+
+
+class Outbox:
+    """
+    Queue for game -> parent postMessage traffic.
+
+    send() only queues; flush() (once per frame, or at most every 'interval'
+    seconds) posts what is queued. Message types in 'coalesce' keep only the
+    latest pending copy, so a burst of SCORE_TICKs becomes one post.
+
+    Payloads become JS objects directly (Object.new() + attributes) instead of
+    json.dumps + JSON.parse; if the bridge can't do that the JSON round trip is
+    used from then on. The postMessage target that worked (window.top, then
+    window.parent, then 'run_script' with a JS literal) is remembered and only
+    re-probed after it fails.
+    """
+
+    def __init__(self, window, run_script=None, interval=0.0, coalesce=("SCORE_TICK",)):
+        self.window = window
+        self.run_script = run_script
+        self.interval = interval
+        self.coalesce = frozenset(coalesce)
+        self._queue = []
+        self._last_flush = float("-inf")
+        self._target = None
+        self._native = True
+        # counters, for debugging from the console
+        self.posted = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def send(self, msg):
+        kind = msg.get("type")
+        if kind in self.coalesce:
+            q = self._queue
+            for i in range(len(q)):
+                if q[i].get("type") == kind:
+                    del q[i]
+                    self.coalesced += 1
+                    break
+        self._queue.append(msg)
+
+    def pending(self):
+        return len(self._queue)
+
+    def flush(self, now=None, force=False):
+        """Post everything queued (unless 'interval' hasn't elapsed); returns how many went out."""
+        if not self._queue:
+            return 0
+        now = time.perf_counter() if now is None else now
+        if not force and now - self._last_flush < self.interval:
+            return 0
+        self._last_flush = now
+        q, self._queue = self._queue, []
+        for msg in q:
+            self._post(msg)
+        return len(q)
+
+    # ---------- transport ----------
+    def _js_object(self, msg):
+        w = self.window
+        if self._native:
+            try:
+                obj = w.Object.new()
+                for k, v in msg.items():
+                    setattr(obj, k, v)
+                return obj
+            except Exception:
+                self._native = False
+        return w.JSON.parse(json.dumps(msg))
+
+    def _targets(self):
+        w = self.window
+        if w is not None:
+            yield lambda msg: w.top.postMessage(self._js_object(msg), "*")
+            yield lambda msg: w.parent.postMessage(self._js_object(msg), "*")
+        if self.run_script is not None:
+            run = self.run_script
+            yield lambda msg: run(f"window.top.postMessage({json.dumps(msg)}, '*')")
+            yield lambda msg: run(f"window.parent.postMessage({json.dumps(msg)}, '*')")
+
+    def _post(self, msg):
+        if self._target is not None:
+            try:
+                self._target(msg)
+                self.posted += 1
+                return True
+            except Exception:
+                self._target = None
+        for target in self._targets():
+            try:
+                target(msg)
+            except Exception:
+                continue
+            self._target = target
+            self.posted += 1
+            return True
+        self.failed += 1
+        return False
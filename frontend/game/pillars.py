@@ -0,0 +1,307 @@
+# =========================
+#  PILLAR RENDERING
+# =========================
+import pygame
+
+# Optional vectorized backend, imported on first use only: the strips are built once at
+# boot, where it saves well under a millisecond, which never pays for importing numpy
+# (or, on pygbag, downloading its wheel). Tools and compare_backends() still use it.
+np = None
+BACKEND = "python"
+
+def load_numpy():
+    """The numpy module, imported on first call; None when it is not installed."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+# --- Gold palette (less cartoony / less bright) ---
+GOLD_SHADOW = (90, 70, 25)     # deep bronze
+GOLD_MID    = (170, 135, 40)   # muted gold
+GOLD_LIGHT  = (210, 190, 120)  # soft highlight (less bright)
+
+RIDGE_LIGHT  = (220, 200, 150, 80)# light ridge line (semi-transparent)
+RIDGE_DARK   = (80, 60, 30, 70)   # shadow ridge line (semi-transparent)
+BORDER_DARK  = (120, 85, 26, 180)   # inner border for definition
+
+RIDGE_STEP = 24
+
+
+def lerp(a, b, t): return a + (b - a) * t
+def lerp_color(c1, c2, t):
+    return (int(lerp(c1[0], c2[0], t)),
+            int(lerp(c1[1], c2[1], t)),
+            int(lerp(c1[2], c2[2], t)))
+
+def fill_horizontal_gradient(target, rect, left_color, mid_color, right_color, mid_pos=0.38):
+    """Left->mid->right three-stop gradient across the width."""
+    w = rect.width
+    if w <= 0 or rect.height <= 0: return
+    for ix in range(w):
+        x = ix / max(1, w - 1)
+        if x <= mid_pos:
+            t = x / max(1e-6, mid_pos)
+            col = lerp_color(left_color, mid_color, t)
+        else:
+            t = (x - mid_pos) / max(1e-6, 1.0 - mid_pos)
+            col = lerp_color(mid_color, right_color, t)
+        pygame.draw.line(target, col, (rect.left + ix, rect.top), (rect.left + ix, rect.bottom - 1))
+
+def draw_coin_ridges(target, rect, step=16):
+    # Two 1px lines (light then slight shadow) every 'step' pixels
+    y = rect.top + 10
+    while y < rect.bottom - 10:
+        if rect.height <= 0: break
+        pygame.draw.line(target, RIDGE_LIGHT, (rect.left + 5, y),  (rect.right - 6, y))
+        y2 = y + 2
+        if y2 < rect.bottom - 2:
+            pygame.draw.line(target, RIDGE_DARK,  (rect.left + 5, y2), (rect.right - 6, y2))
+        y += step
+
+def edge_sheen_and_border(target, rect, border_rect=None):
+    # Slight left/right rim darkening and a slim specular band
+    pygame.draw.rect(target, (0, 0, 0, 60), (rect.left,        rect.top, 3, rect.height))  # left shadow
+    pygame.draw.rect(target, (0, 0, 0, 70), (rect.right - 4,   rect.top, 4, rect.height))  # right shadow
+    # Specular highlight band ~35% from the left
+    band_w = max(2, rect.width // 10)
+    band_x = rect.left + int(rect.width * 0.35)
+    highlight = pygame.Surface((band_w, rect.height), pygame.SRCALPHA)
+    for iy in range(rect.height):
+        t = 1.0 - abs((iy / max(1, rect.height - 1)) - 0.5) * 2.0  # stronger in the middle
+        a = int(20 + 20 * t)  # 20..40 alpha → much more subtle
+        pygame.draw.line(highlight, (255, 255, 255, a), (0, iy), (band_w - 1, iy))
+    target.blit(highlight, (band_x, rect.top))
+
+    # Soft inner border for definition (rounded a touch)
+    inset = (border_rect or rect).inflate(-2, -2)
+    if inset.width > 0 and inset.height > 0:
+        pygame.draw.rect(target, BORDER_DARK, inset, width=2, border_radius=6)
+
+# --- numpy/surfarray versions of the helpers above (same float math -> same pixels) ---
+def _gradient_colors_np(w, left_color, mid_color, right_color, mid_pos):
+    x = np.arange(w) / max(1, w - 1)
+    t_left  = x / max(1e-6, mid_pos)
+    t_right = (x - mid_pos) / max(1e-6, 1.0 - mid_pos)
+    lo = np.array(left_color[:3]); mi = np.array(mid_color[:3]); hi = np.array(right_color[:3])
+    cols = np.where((x <= mid_pos)[:, None],
+                    lo + (mi - lo) * t_left[:, None],
+                    mi + (hi - mi) * t_right[:, None])
+    return cols.astype(np.int64)  # int() truncation, as lerp_color does
+
+def _section_pixels_np(target, rect, step):
+    """Gradient, ridges and rim shadows written straight into the pixel arrays."""
+    rgb = pygame.surfarray.pixels3d(target)
+    alpha = pygame.surfarray.pixels_alpha(target)
+    try:
+        x0, x1, y0, y1 = rect.left, rect.right, rect.top, rect.bottom
+        rgb[x0:x1, y0:y1] = _gradient_colors_np(rect.width, GOLD_SHADOW, GOLD_LIGHT, GOLD_MID, 0.40)[:, None, :]
+        alpha[x0:x1, y0:y1] = 255
+
+        # ridges: light line at y, shadow line at y + 2, from left+5 to right-6 inclusive
+        ys = np.arange(y0 + 10, y1 - 10, step)
+        rx0, rx1 = x0 + 5, x1 - 5
+        if len(ys) and rx1 > rx0:
+            rgb[rx0:rx1, ys] = RIDGE_LIGHT[:3]
+            alpha[rx0:rx1, ys] = RIDGE_LIGHT[3]
+            ys2 = ys[ys + 2 < y1 - 2] + 2
+            rgb[rx0:rx1, ys2] = RIDGE_DARK[:3]
+            alpha[rx0:rx1, ys2] = RIDGE_DARK[3]
+
+        # left/right rim shadows (draw.rect replaces pixels, it does not blend)
+        rgb[x0:x0 + 3, y0:y1] = 0
+        alpha[x0:x0 + 3, y0:y1] = 60
+        rgb[x1 - 4:x1, y0:y1] = 0
+        alpha[x1 - 4:x1, y0:y1] = 70
+    finally:
+        del rgb, alpha  # release the surface lock before blitting
+
+def _highlight_band_np(band_w, h):
+    highlight = pygame.Surface((band_w, h), pygame.SRCALPHA)
+    iy = np.arange(h)
+    t = 1.0 - np.abs((iy / max(1, h - 1)) - 0.5) * 2.0
+    a = (20 + 20 * t).astype(np.int64)
+    rgb = pygame.surfarray.pixels3d(highlight)
+    alpha = pygame.surfarray.pixels_alpha(highlight)
+    rgb[:] = 255
+    alpha[:] = a[None, :]
+    del rgb, alpha
+    return highlight
+
+def _draw_section_np(target, rect, border_rect=None):
+    _section_pixels_np(target, rect, RIDGE_STEP)
+    band_w = max(2, rect.width // 10)
+    band_x = rect.left + int(rect.width * 0.35)
+    target.blit(_highlight_band_np(band_w, rect.height), (band_x, rect.top))
+    inset = (border_rect or rect).inflate(-2, -2)
+    if inset.width > 0 and inset.height > 0:
+        pygame.draw.rect(target, BORDER_DARK, inset, width=2, border_radius=6)
+
+def draw_section(target, rect, border_rect=None, backend=None):
+    """One solid coin-stack section; 'border_rect' lets callers push the border ends off-canvas."""
+    if rect.height <= 0: return
+    if (backend or BACKEND) == "numpy" and load_numpy() is not None:
+        _draw_section_np(target, rect, border_rect)
+        return
+    # base fill with a 3-stop horizontal gradient (gives "cylinder" feel)
+    fill_horizontal_gradient(target, rect, GOLD_SHADOW, GOLD_LIGHT, GOLD_MID, mid_pos=0.40)
+    draw_coin_ridges(target, rect, step=RIDGE_STEP)     # subtle 1px coin edges
+    edge_sheen_and_border(target, rect, border_rect)    # sheen + definition
+
+def make_pillar_surface(gap_y, gap_size, width, height, backend=None):
+    """
+    Render each pillar section as a soft gold coin stack:
+    - Left/right rim shading (horizontal gradient)
+    - Soft specular highlight band
+    - Subtle coin ridges (paired light/dark 1px lines)
+    Full-height reference renderer; the game draws through PillarRenderer.
+    """
+    surf = pygame.Surface((width, height), pygame.SRCALPHA)
+
+    gap_top = max(0, gap_y - gap_size // 2)
+    gap_bot = min(height, gap_y + gap_size // 2)
+    top_rect    = pygame.Rect(0, 0, width, max(0, gap_top))
+    bottom_rect = pygame.Rect(0, gap_bot, width, max(0, height - gap_bot))
+
+    draw_section(surf, top_rect, backend=backend)
+    draw_section(surf, bottom_rect, backend=backend)
+
+    # carve out the gap as transparent
+    gap_rect = pygame.Rect(0, gap_top, width, max(0, gap_bot - gap_top))
+    if gap_rect.height > 0:
+        surf.fill((0, 0, 0, 0), gap_rect)
+
+    return surf
+
+def compare_backends(gap_y, gap_size, width, height):
+    """Number of pixels where the numpy and python renderers disagree (0 = identical)."""
+    if load_numpy() is None:
+        raise RuntimeError("numpy backend unavailable")
+    a = make_pillar_surface(gap_y, gap_size, width, height, backend="python")
+    b = make_pillar_surface(gap_y, gap_size, width, height, backend="numpy")
+    pa = np.dstack((pygame.surfarray.array3d(a), pygame.surfarray.array_alpha(a)))
+    pb = np.dstack((pygame.surfarray.array3d(b), pygame.surfarray.array_alpha(b)))
+    return int(np.any(pa != pb, axis=2).sum())
+
+
+class PillarRenderer:
+    """
+    Pre-builds the coin-stack look once and draws every pillar from shared strips:
+    - body: one full-height section (gradient, ridges, sheen, rounded border)
+    - top_cap / bottom_cap: its first and last CAP_H rows, the rounded ends
+    A pillar section is top_cap + a slice of body + bottom_cap, so spawning
+    costs nothing and no per-pillar surface is kept alive. Sections shorter
+    than two caps are drawn once per height and cached (they only occur next
+    to the screen edge and are tiny).
+    The result matches make_pillar_surface() except for the specular band:
+    its brightness ramp spans the full column instead of each section, so
+    the band is off by a few levels (selfcheck pillar_renderer bounds it).
+    style="flat" is the low-quality look: gradient only, no ridges, sheen or
+    rounded ends. Its strips stay SRCALPHA (fully opaque): narrow opaque RGB
+    blits measured slower than SDL's alpha blitter here.
+    rle=True RLE-encodes the strips: opaque runs are copied and only the
+    translucent pixels blended, roughly halving the cost of a pillar. SDL's
+    RLE blender rounds slightly differently, so the exact look (and the
+    collision masks) use rle=False.
+    """
+    CAP_H = 8
+
+    def __init__(self, width, height, backend=None, style="full", rle=False):
+        self.width = width
+        self.height = height
+        self.style = style
+        self.rle = rle
+        self._short = {}   # height -> whole section, for sections shorter than two caps
+        if style == "flat":
+            self._build_flat()
+        else:
+            self._build_full(backend)
+        if rle:
+            self.body.set_alpha(255, pygame.RLEACCEL)
+            self.top_cap = self._rle_copy(self.top_cap)
+            self.bottom_cap = self._rle_copy(self.bottom_cap)
+
+    @staticmethod
+    def _rle_copy(strip):
+        """Standalone RLE copy of a strip (RLE applies to whole surfaces, not subsurfaces)."""
+        out = strip.copy()
+        out.set_alpha(255, pygame.RLEACCEL)
+        return out
+
+    def _build_full(self, backend):
+        width, height, cap = self.width, self.height, self.CAP_H
+        self.backend = backend
+        self.body = pygame.Surface((width, height), pygame.SRCALPHA)
+        draw_section(self.body, self.body.get_rect(), backend=backend)
+        # a section's ends never carry ridges (they stop 10 px in), so any height shares these
+        self.top_cap    = self.body.subsurface((0, 0, width, cap))
+        self.bottom_cap = self.body.subsurface((0, height - cap, width, cap))
+
+    def _build_flat(self):
+        width, height, cap = self.width, self.height, self.CAP_H
+        self.body = pygame.Surface((width, height), pygame.SRCALPHA)
+        fill_horizontal_gradient(self.body, self.body.get_rect(), GOLD_SHADOW, GOLD_LIGHT, GOLD_MID, mid_pos=0.40)
+        ends = pygame.Surface((width, 2 * cap), pygame.SRCALPHA)
+        ends.blit(self.body, (0, 0))
+        ends.fill(BORDER_DARK[:3], (0, 0, width, 2))
+        ends.fill(BORDER_DARK[:3], (0, 2 * cap - 2, width, 2))
+        self.top_cap    = ends.subsurface((0, 0, width, cap))
+        self.bottom_cap = ends.subsurface((0, cap, width, cap))
+
+    def section_spans(self, gap_y, gap_size):
+        """(top, height) of the solid sections above and below the gap."""
+        gap_top = max(0, gap_y - gap_size // 2)
+        gap_bot = min(self.height, gap_y + gap_size // 2)
+        return (0, gap_top), (gap_bot, max(0, self.height - gap_bot))
+
+    def draw_section(self, target, x, top, h):
+        if h <= 0: return
+        cap = self.CAP_H
+        if h < 2 * cap:
+            if self.style != "flat":
+                target.blit(self._short_section(h), (x, top))
+                return
+            # too short for both ends: split what there is between them
+            half = h // 2
+            target.blit(self.top_cap, (x, top), (0, 0, self.width, half))
+            target.blit(self.bottom_cap, (x, top + half), (0, cap - (h - half), self.width, h - half))
+            return
+        target.blit(self.top_cap, (x, top))
+        # body rows keep the same offset from the section top, so ridges line up as before
+        end = h - cap
+        y = self._stray_ridge(h)
+        if y is None:
+            target.blit(self.body, (x, top + cap), (0, cap, self.width, end - cap))
+        else:
+            target.blit(self.body, (x, top + cap), (0, cap, self.width, y - cap))
+            target.blit(self.body, (x, top + y), (0, y - 1, self.width, 1))
+            target.blit(self.body, (x, top + y + 1), (0, y + 1, self.width, end - y - 1))
+        target.blit(self.bottom_cap, (x, top + end))
+
+    def _stray_ridge(self, h):
+        """Row of a light ridge the body has but a section of height h does not (ridges
+        stop 10 px above its end), or None; it is drawn from the plain row above."""
+        if self.style == "flat":
+            return None
+        for y in (h - 10, h - 9):
+            if y >= 10 and (y - 10) % RIDGE_STEP == 0:
+                return y
+        return None
+
+    def _short_section(self, h):
+        surf = self._short.get(h)
+        if surf is None:
+            surf = pygame.Surface((self.width, h), pygame.SRCALPHA)
+            draw_section(surf, surf.get_rect(), backend=self.backend)
+            if self.rle:
+                surf.set_alpha(255, pygame.RLEACCEL)
+            self._short[h] = surf
+        return surf
+
+    def draw(self, target, x, gap_y, gap_size):
+        for top, h in self.section_spans(gap_y, gap_size):
+            self.draw_section(target, x, top, h)
@@ -0,0 +1,144 @@
+# =========================
+#  FRAME PROFILER HUD
+# =========================
+from array import array
+import time
+
+import pygame
+
+GRAPH_W, GRAPH_H = 200, 48
+LINE_H = 13
+PAD = 4
+
+
+class FrameProfiler:
+    """
+    Per-phase frame timings kept in fixed-size ring buffers, with a HUD.
+
+    The loop calls begin() at the top of a frame, lap(phase) after each phase
+    (time since the previous lap is added to that phase, so a phase may be
+    lapped several times a frame, e.g. once per simulation step) and end()
+    once the frame is done. While 'enabled' is False every call returns
+    immediately. draw() blits a panel with a frame-time graph (bars over
+    'budget' in red) and p50/p95/p99 per phase; the panel is re-rendered
+    every 'refresh' frames, not every frame.
+    """
+
+    def __init__(self, phases, size=240, budget=1.0 / 60, refresh=15):
+        self.phases = tuple(phases)
+        self.size = size
+        self.budget = budget
+        self.refresh = refresh
+        self.enabled = False
+        self._rings = {p: array("d", bytes(8 * size)) for p in self.phases}
+        self._frames = array("d", bytes(8 * size))
+        self._cur = dict.fromkeys(self.phases, 0.0)
+        self.count = 0          # frames recorded (ring holds the last 'size')
+        self._start = self._t = 0.0
+        self._panel = None
+        self._panel_at = -1
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.count = 0
+            self._panel = None
+            self.begin()   # toggled mid-frame: time the rest of it
+        return self.enabled
+
+    # ---------- recording ----------
+    def begin(self):
+        if not self.enabled:
+            return
+        cur = self._cur
+        for p in cur:
+            cur[p] = 0.0
+        self._start = self._t = time.perf_counter()
+
+    def lap(self, phase):
+        if not self.enabled:
+            return
+        t = time.perf_counter()
+        self._cur[phase] += t - self._t
+        self._t = t
+
+    def end(self):
+        if not self.enabled:
+            return
+        i = self.count % self.size
+        for p, v in self._cur.items():
+            self._rings[p][i] = v
+        self._frames[i] = time.perf_counter() - self._start
+        self.count += 1
+
+    # ---------- stats ----------
+    def samples(self, phase=None):
+        buf = self._frames if phase is None else self._rings[phase]
+        n = min(self.count, self.size)
+        if n < self.size:
+            return list(buf[:n])
+        i = self.count % self.size
+        return list(buf[i:]) + list(buf[:i])   # oldest first
+
+    @staticmethod
+    def percentile(sorted_samples, p):
+        if not sorted_samples:
+            return 0.0
+        return sorted_samples[min(len(sorted_samples) - 1, int(p / 100.0 * len(sorted_samples)))]
+
+    def over_budget(self):
+        return sum(1 for v in self.samples() if v > self.budget)
+
+    def summary(self):
+        s = sorted(self.samples())
+        p = self.percentile
+        parts = [f"frame p50 {p(s, 50) * 1000:.2f} p95 {p(s, 95) * 1000:.2f} p99 {p(s, 99) * 1000:.2f} ms, "
+                 f"{self.over_budget()}/{len(s)} over {self.budget * 1000:.1f} ms"]
+        for ph in self.phases:
+            ps = sorted(self.samples(ph))
+            parts.append(f"{ph} {p(ps, 50) * 1000:.2f}/{p(ps, 95) * 1000:.2f}/{p(ps, 99) * 1000:.2f}")
+        return "; ".join(parts)
+
+    # ---------- HUD ----------
+    def _build_panel(self, font):
+        frames = self.samples()
+        s = sorted(frames)
+        p = self.percentile
+        lines = [(f"frame {p(s, 50) * 1000:5.2f} {p(s, 95) * 1000:5.2f} {p(s, 99) * 1000:5.2f} ms"
+                  f"  over {self.over_budget()}", (255, 255, 255))]
+        for ph in self.phases:
+            ps = sorted(self.samples(ph))
+            lines.append((f"{ph:<10s} {p(ps, 50) * 1000:5.2f} {p(ps, 95) * 1000:5.2f} {p(ps, 99) * 1000:5.2f}",
+                          (200, 220, 255)))
+
+        h = GRAPH_H + PAD * 3 + LINE_H * len(lines)
+        panel = pygame.Surface((GRAPH_W + PAD * 2, h), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+
+        # frame-time graph: 2x budget full height, newest frame on the right
+        scale = GRAPH_H / (2 * self.budget)
+        base = PAD + GRAPH_H
+        shown = frames[-GRAPH_W:]
+        x = PAD + GRAPH_W - len(shown)
+        for v in shown:
+            bar = min(GRAPH_H, max(1, int(v * scale)))
+            col = (230, 70, 60) if v > self.budget else (90, 200, 110)
+            pygame.draw.line(panel, col, (x, base - bar), (x, base))
+            x += 1
+        budget_y = base - int(self.budget * scale)
+        pygame.draw.line(panel, (255, 215, 120), (PAD, budget_y), (PAD + GRAPH_W, budget_y))
+
+        y = base + PAD
+        for text, col in lines:
+            panel.blit(font.render(text, True, col), (PAD, y))
+            y += LINE_H
+        return panel
+
+    def draw(self, target, font, pos):
+        """Blit the HUD at 'pos'; returns the rect drawn (None when disabled)."""
+        if not self.enabled:
+            return None
+        if self._panel is None or self.count - self._panel_at >= self.refresh:
+            self._panel = self._build_panel(font)
+            self._panel_at = self.count
+        return target.blit(self._panel, pos)
@@ -0,0 +1,87 @@
+# =========================
+#  ADAPTIVE QUALITY
+# =========================
+from array import array
+
+
+class QualityGovernor:
+    """
+    Picks a quality tier (0 = best, levels - 1 = cheapest) from measured frame times.
+
+    sample(load) takes one frame's load, in the same unit as 'budget' (the
+    game uses work time as a fraction of the tier's frame period, so tiers
+    with a lower fps are not mistaken for heavier ones). Every 'window'
+    samples it looks at their 90th percentile: over 'budget' steps one tier down;
+    under 'headroom' * budget for 'up_windows' windows in a row steps one
+    tier back up. Stepping down again soon after a step up doubles the good
+    windows needed next time (up to 'max_up_windows'), so a device on the
+    edge settles instead of flapping between two tiers.
+    lock(tier) pins a tier; lock(None) hands control back to the measurements.
+    """
+
+    def __init__(self, levels, budget, window=60, headroom=0.5, up_windows=3, max_up_windows=48):
+        self.levels = levels
+        self.budget = budget
+        self.window = window
+        self.headroom = headroom
+        self.up_windows = up_windows
+        self.max_up_windows = max_up_windows
+        self.tier = 0
+        self.locked = False
+        self.changes = 0
+        self.last_p90 = 0.0
+        self._buf = array("d", bytes(8 * window))
+        self._n = 0
+        self._good = 0          # consecutive windows with headroom
+        self._since_up = None   # windows since the last step up
+
+    def lock(self, tier):
+        """Pin 'tier' (clamped), or None for automatic; True when the tier changed."""
+        if tier is None:
+            self.locked = False
+            return False
+        self.locked = True
+        return self._set(max(0, min(self.levels - 1, int(tier))))
+
+    def _set(self, tier):
+        if tier == self.tier:
+            return False
+        self.tier = tier
+        self.changes += 1
+        self._n = 0
+        self._good = 0
+        return True
+
+    def sample(self, load):
+        """Record one frame; True when the tier changed."""
+        self._buf[self._n] = load
+        self._n += 1
+        if self._n < self.window:
+            return False
+        self._n = 0
+        p90 = self.last_p90 = sorted(self._buf)[int(0.9 * self.window)]
+        if self.locked:
+            return False
+        if self._since_up is not None:
+            self._since_up += 1
+        if p90 > self.budget:
+            self._good = 0
+            if self.tier < self.levels - 1:
+                if self._since_up is not None and self._since_up <= 2 * self.up_windows:
+                    self.up_windows = min(self.max_up_windows, self.up_windows * 2)
+                self._since_up = None
+                return self._set(self.tier + 1)
+            return False
+        if p90 < self.budget * self.headroom and self.tier > 0:
+            self._good += 1
+            if self._good >= self.up_windows:
+                self._since_up = 0
+                return self._set(self.tier - 1)
+        else:
+            self._good = 0
+        return False
+
+    def report(self):
+        return (f"quality: tier {self.tier}{' (locked)' if self.locked else ''}, "
+                f"p90 load {self.last_p90:.0%} of {self.budget:.0%} budget, "
+                f"{self.changes} changes")
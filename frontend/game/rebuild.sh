@@ -2,6 +2,9 @@
 set -euo pipefail
 PYTHON_BIN="${PYTHON_BIN:-python3}"
 
+# Pre-scaled images + manifest (assets/gen/), fails if the bundle is over budget
+"$PYTHON_BIN" tools/build_assets.py
+
 "$PYTHON_BIN" -m pygbag --ume_block 0 --build main.py
 
 F="build/web/index.html"
@@ -0,0 +1,161 @@
+# =========================
+#  REPLAYS
+# =========================
+# A run is reproduced exactly by its seed, the fixed step rate, the capybara's
+# row when it started and the inputs handed to GameWorld.step() from then on
+# (steps count from the run's start, GameWorld.begin_run(), which is step 1).
+# The binary format stores just that:
+#
+#   "CPR" version:u8 hz:u16 seed:u32 y:u16    header (12 bytes, little endian)
+#   n:varint, then n inputs                   each: varint(step_delta << 2 | kind)
+#                                              [+ varint(codepoint) for chars]
+#   end_step:varint score:varint              trailer (claimed result)
+#
+# Steps are delta-encoded, so a flap every ~0.4 s at 120 Hz costs 2 bytes and a
+# typical run is a few hundred bytes.
+import struct
+from collections import namedtuple
+
+from world import GameWorld, Inputs
+
+MAGIC = b"CPR"
+VERSION = 2
+HEADER = struct.Struct("<BHIH")   # version, hz, seed, starting row (after MAGIC)
+REPLAY_HZ = 120            # step rate replays are verified at (main.SIM_HZ default)
+MAX_RUN_SECONDS = 3600.0   # longest run a replay may claim (title/ready time is not part of it)
+K_FLAP, K_START, K_BACK, K_CHAR = 0, 1, 2, 3
+
+Replay = namedtuple("Replay", "hz seed start_y inputs end_step score")  # inputs: [(step, kind, char)]
+ReplayResult = namedtuple("ReplayResult", "score steps claimed_score claimed_steps ok")
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def _put_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _get_varint(data, i):
+    n = shift = 0
+    while True:
+        if i >= len(data):
+            raise ReplayError("truncated replay")
+        b = data[i]; i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+
+class ReplayRecorder:
+    """Collects one run's inputs from GameWorld.step(); finish() returns the encoded bytes."""
+
+    def __init__(self, hz):
+        self.hz = int(hz)
+        self.seed = 0
+        self.start_y = 0
+        self.done = True
+        self._buf = bytearray()
+        self._count = 0
+        self._last_step = 0
+
+    def begin(self, seed, start_y):
+        self.seed = seed
+        self.start_y = start_y
+        self.done = False
+        self._buf = bytearray()
+        self._count = 0
+        self._last_step = 0
+
+    def _put(self, step, kind, ch=None):
+        _put_varint(self._buf, ((step - self._last_step) << 2) | kind)
+        self._last_step = step
+        if ch is not None:
+            _put_varint(self._buf, ord(ch))
+        self._count += 1
+
+    def record(self, step, inputs):
+        if self.done:
+            return
+        if inputs.start: self._put(step, K_START)
+        if inputs.flap:  self._put(step, K_FLAP)
+        for _ in range(inputs.backspace):
+            self._put(step, K_BACK)
+        for ch in inputs.chars:
+            self._put(step, K_CHAR, ch)
+
+    def finish(self, end_step, score):
+        out = bytearray(MAGIC)
+        out += HEADER.pack(VERSION, self.hz, self.seed & 0xFFFFFFFF, self.start_y)
+        _put_varint(out, self._count)
+        out += self._buf
+        _put_varint(out, end_step)
+        _put_varint(out, score)
+        self.done = True
+        return bytes(out)
+
+
+def decode(data, hz=REPLAY_HZ):
+    """Replay from 'data'; its step rate must be 'hz' and its length at most MAX_RUN_SECONDS."""
+    if data[:3] != MAGIC:
+        raise ReplayError("not a replay")
+    i = len(MAGIC) + HEADER.size
+    if len(data) < i:
+        raise ReplayError("truncated replay")
+    version, rep_hz, seed, start_y = HEADER.unpack_from(data, len(MAGIC))
+    if version != VERSION:
+        raise ReplayError(f"unsupported replay version {version}")
+    if rep_hz != hz:
+        raise ReplayError(f"step rate {rep_hz} Hz, expected {hz} Hz")
+    count, i = _get_varint(data, i)
+    inputs = []
+    step = 0
+    for _ in range(count):
+        v, i = _get_varint(data, i)
+        step += v >> 2
+        kind = v & 3
+        ch = None
+        if kind == K_CHAR:
+            cp, i = _get_varint(data, i)
+            ch = chr(cp)
+        inputs.append((step, kind, ch))
+    end_step, i = _get_varint(data, i)
+    if end_step > MAX_RUN_SECONDS * hz:
+        raise ReplayError("run longer than MAX_RUN_SECONDS")
+    score, i = _get_varint(data, i)
+    return Replay(rep_hz, seed, start_y, inputs, end_step, score)
+
+
+def resimulate(data, hz=REPLAY_HZ):
+    """
+    Re-run a replay headlessly; ok is True when score and length match the claim exactly.
+    A run that does not start on its first step is rejected without stepping.
+    """
+    rep = decode(data, hz)
+    pending = rep.inputs
+    if not pending or pending[0][:2] != (1, K_START):
+        return ReplayResult(0, 0, rep.score, rep.end_step, False)
+    world = GameWorld(seed=rep.seed)
+    world.state = "ready"
+    world.capy_rect.centery = rep.start_y
+    dt = 1.0 / rep.hz
+    inputs = Inputs()
+    k = 0
+    while world.state != "gameover" and world.steps < rep.end_step:
+        step = world.steps + 1
+        while k < len(pending) and pending[k][0] == step:
+            _, kind, ch = pending[k]
+            if kind == K_FLAP: inputs.flap = True
+            elif kind == K_START: inputs.start = True
+            elif kind == K_BACK: inputs.backspace += 1
+            else: inputs.chars.append(ch)
+            k += 1
+        world.step(dt, inputs if inputs else None)
+        inputs.clear()
+        world.events.clear()
+    ok = world.state == "gameover" and world.score == rep.score and world.steps == rep.end_step
+    return ReplayResult(world.score, world.steps, rep.score, rep.end_step, ok)
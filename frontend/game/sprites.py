@@ -0,0 +1,86 @@
+# =========================
+#  PRE-ROTATED SPRITES
+# =========================
+import time
+
+import pygame
+
+
+class RotationTable:
+    """
+    Rotations of one sprite at a fixed angular step over [min_angle, max_angle].
+    Entries are built lazily (or all at once with warm()) and hold the rotated
+    surface plus the offset from the sprite centre to its top-left corner, so a
+    frame only does a list lookup and a blit instead of transform.rotate().
+    """
+
+    def __init__(self, image, min_angle, max_angle, step=2.0):
+        self.image = image
+        self.step = float(step)
+        self.min_angle = float(min_angle)
+        self.max_angle = float(max_angle)
+        self.count = int(round((self.max_angle - self.min_angle) / self.step)) + 1
+        self._entries = [None] * self.count
+
+    def index(self, angle):
+        i = int(round((angle - self.min_angle) / self.step))
+        return 0 if i < 0 else (self.count - 1 if i >= self.count else i)
+
+    def angle_at(self, i):
+        return self.min_angle + i * self.step
+
+    def entry(self, i):
+        e = self._entries[i]
+        if e is None:
+            surf = pygame.transform.rotate(self.image, self.angle_at(i))
+            w, h = surf.get_size()
+            e = (surf, (-(w // 2), -(h // 2)))
+            self._entries[i] = e
+        return e
+
+    def get(self, angle):
+        """(surface, (dx, dy)) for the nearest quantized angle; blit at center + (dx, dy)."""
+        return self.entry(self.index(angle))
+
+    def blit(self, target, angle, center):
+        surf, (dx, dy) = self.entry(self.index(angle))
+        return target.blit(surf, (center[0] + dx, center[1] + dy))
+
+    def warm(self):
+        for i in range(self.count):
+            self.entry(i)
+        return self
+
+    def warm_steps(self, batch=8):
+        """Generator form of warm(): builds 'batch' entries per step (for background loading)."""
+        for i in range(self.count):
+            self.entry(i)
+            if i % batch == batch - 1:
+                yield
+
+    def footprint_bytes(self):
+        total = 0
+        for e in self._entries:
+            if e is not None:
+                s = e[0]
+                total += s.get_width() * s.get_height() * s.get_bytesize()
+        return total
+
+    def measure(self, samples=600):
+        """Per-frame cost (seconds) of transform.rotate vs a table lookup over the full range."""
+        angles = [self.min_angle + (self.max_angle - self.min_angle) * k / max(1, samples - 1)
+                  for k in range(samples)]
+        t0 = time.perf_counter()
+        for a in angles:
+            pygame.transform.rotate(self.image, a)
+        t1 = time.perf_counter()
+        for a in angles:
+            self.get(a)
+        t2 = time.perf_counter()
+        return (t1 - t0) / samples, (t2 - t1) / samples
+
+    def report(self):
+        built = sum(1 for e in self._entries if e is not None)
+        return (f"rotation table: {built}/{self.count} angles, step {self.step:g} deg, "
+                f"range [{self.min_angle:.1f}, {self.max_angle:.1f}], "
+                f"{self.footprint_bytes() / 1024:.1f} KiB")
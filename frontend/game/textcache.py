@@ -0,0 +1,76 @@
+# =========================
+#  FONT & TEXT CACHE
+# =========================
+from collections import OrderedDict
+
+import pygame
+
+
+class FontRegistry:
+    """One pygame Font per (family, size, bold); SysFont lookups are slow, especially on web."""
+
+    def __init__(self):
+        self._fonts = {}
+        self._fits = {}
+        self.created = 0
+
+    def get(self, family, size, bold=False):
+        key = (family, int(size), bool(bold))
+        f = self._fonts.get(key)
+        if f is None:
+            f = pygame.font.SysFont(family, key[1], bold=key[2])
+            self._fonts[key] = f
+            self.created += 1
+        return f
+
+    def fit_size(self, family, label, max_w, max_h, bold=False, lo=8, hi=None):
+        """Largest size whose rendered 'label' fits max_w x max_h (binary search, memoized)."""
+        key = (family, label, max_w, max_h, bool(bold), lo, hi)
+        best = self._fits.get(key)
+        if best is not None:
+            return best
+        best = lo
+        hi = max(12, max_h) if hi is None else hi
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            w, h = self.get(family, mid, bold).size(label)
+            if w <= max_w and h <= max_h:
+                best = mid
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        self._fits[key] = best
+        return best
+
+
+class TextCache:
+    """
+    Bounded LRU of rendered text surfaces keyed by (text, font, colour, antialias).
+    Callers must treat returned surfaces as read-only: they are shared.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (text, font, tuple(color), antialias)
+        s = self._cache.get(key)
+        if s is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return s
+        s = font.render(text, antialias, color)
+        self._cache[key] = s
+        self.misses += 1
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return s
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,139 @@
+# =========================
+#  FIXED-TIMESTEP CLOCK
+# =========================
+
+
+class FixedStep:
+    """
+    Accumulator for a fixed-rate simulation driven by variable frame times.
+
+    advance(frame_dt) returns how many steps of 'dt' seconds to run this frame;
+    'alpha' is how far the render time sits between the last two simulated
+    states (0..1) for interpolation. At most 'max_steps' run per frame: on slow
+    devices the leftover time is dropped (the game slows down) instead of
+    spiralling into ever longer catch-up frames.
+    """
+
+    def __init__(self, hz=120, max_steps=8):
+        self.set_rate(hz)
+        self.max_steps = max_steps
+        self.acc = 0.0
+        self.dropped = 0.0  # seconds of simulation skipped by the catch-up cap
+
+    def set_rate(self, hz):
+        self.hz = float(hz)
+        self.dt = 1.0 / self.hz
+
+    def reset(self):
+        self.acc = 0.0
+
+    def advance(self, frame_dt, max_steps=None):
+        """Steps due after 'frame_dt' seconds; 'max_steps' overrides the cap for this frame."""
+        cap = self.max_steps if max_steps is None else max_steps
+        self.acc += max(0.0, frame_dt)
+        n = int(self.acc / self.dt)
+        if n > cap:
+            self.dropped += (n - cap) * self.dt
+            self.acc -= (n - cap) * self.dt
+            n = cap
+        self.acc -= n * self.dt
+        return n
+
+    @property
+    def alpha(self):
+        return min(1.0, self.acc / self.dt)
+
+
+class FrameStats:
+    """
+    Rolling frame-interval and input-to-present samples (seconds).
+    input_handled() stamps a gameplay input (when it happened, if known);
+    presented() closes the frame and turns pending stamps into latencies.
+    """
+
+    def __init__(self, size=240):
+        self.size = size
+        self.intervals = []
+        self.latencies = []
+        self._last_present = None
+        self._pending = []
+
+    def _push(self, buf, v):
+        buf.append(v)
+        if len(buf) > self.size:
+            del buf[0]
+
+    def input_handled(self, t):
+        self._pending.append(t)
+
+    def presented(self, t):
+        if self._last_present is not None:
+            self._push(self.intervals, t - self._last_present)
+        self._last_present = t
+        for t_in in self._pending:
+            self._push(self.latencies, t - t_in)
+        self._pending.clear()
+
+    @staticmethod
+    def percentile(samples, p):
+        if not samples:
+            return 0.0
+        s = sorted(samples)
+        return s[min(len(s) - 1, int(p / 100.0 * len(s)))]
+
+    def jitter(self):
+        """Standard deviation of frame intervals."""
+        n = len(self.intervals)
+        if n < 2:
+            return 0.0
+        mean = sum(self.intervals) / n
+        return (sum((x - mean) ** 2 for x in self.intervals) / n) ** 0.5
+
+    def summary(self):
+        p = self.percentile
+        return (f"frame p50 {p(self.intervals, 50) * 1000:.1f} ms, p95 {p(self.intervals, 95) * 1000:.1f} ms, "
+                f"jitter {self.jitter() * 1000:.2f} ms; input->present p50 {p(self.latencies, 50) * 1000:.1f} ms, "
+                f"p95 {p(self.latencies, 95) * 1000:.1f} ms")
+
+
+class FlapQueue:
+    """
+    Gameplay taps waiting for the fixed step that covers the moment they happened.
+
+    push(t) queues a tap stamped with its perf_counter() time, or None when
+    the time is unknown (read straight from the queue, as on web). due(step_time)
+    releases every tap at or before 'step_time', so a tap lands in the same
+    step whichever part of the frame it arrived in; taps with no time, or
+    all taps when 'stamped' is off, go to the first step that runs, as
+    before. 'lags' keeps step time minus tap time for released stamped taps.
+    """
+
+    def __init__(self, stamped=True, size=240):
+        self.stamped = stamped
+        self.size = size
+        self.lags = []
+        self._taps = []
+
+    def __len__(self):
+        return len(self._taps)
+
+    def push(self, t):
+        self._taps.append(t)
+
+    def clear(self):
+        self._taps.clear()
+
+    def due(self, step_time):
+        """True when a tap belongs to the step ending at 'step_time' (the taps are released)."""
+        taps = self._taps
+        n = 0
+        while n < len(taps) and (taps[n] is None or not self.stamped or taps[n] <= step_time):
+            t = taps[n]
+            if t is not None:
+                self.lags.append(step_time - t)
+                if len(self.lags) > self.size:
+                    del self.lags[0]
+            n += 1
+        if n:
+            del taps[:n]
+        return n > 0
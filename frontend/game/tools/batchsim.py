@@ -0,0 +1,219 @@
+"""
+NumPy batch simulator: thousands of autopilot runs stepped together.
+
+    python tools/batchsim.py [--runs 10000] [--hz 120] [--max-seconds 300] [--verify 200]
+
+Holds the capybara position/velocity of N independent runs and their pillars
+(x, gap_y, gap_size in a fixed slot pool per run) in arrays and advances all
+of them per step with the GameWorld rules: GRAVITY, FLAP_VELOCITY,
+SCROLL_SPEED, OBSTACLE_HITBOX_INSET_X, spacing/jitter and the human check.
+Runs use the same seeds and the same autopilot as tools/simulate.py, and the
+rare random draws (spawns, challenge codes) go through each run's own
+random.Random(seed) in the same order as GameWorld, so results match the
+scalar game exactly. --verify N replays the first N seeds through GameWorld
+and fails on any difference.
+"""
+import argparse, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # game folder
+
+import numpy as np
+
+import world as W
+from simulate import AUTOPILOT_CLEARANCE, AUTOPILOT_LOOKBEHIND, play_run
+
+START, PLAY, CHALLENGE, READY, OVER = 0, 1, 2, 3, 4
+
+CAPY_LEFT = W.CAPY_X - W.CAPY_HITBOX[0] // 2
+CAPY_RIGHT = CAPY_LEFT + W.CAPY_HITBOX[0]
+CAPY_HALF_H = W.CAPY_HITBOX[1] // 2
+HITBOX_W = max(2, W.OBSTACLE_WIDTH - 2 * W.OBSTACLE_HITBOX_INSET_X)
+
+
+class BatchSim:
+    def __init__(self, seeds, hz=120, capacity=8):
+        n = len(seeds)
+        self.n = n
+        self.hz = hz
+        self.dt = 1.0 / hz
+        self.t = 0.0  # every run starts together, so they share one clock
+        self.rngs = [random.Random(s) for s in seeds]
+        self.ids = np.arange(n)  # position in 'seeds' of each row
+        self.state = np.full(n, START, np.int8)
+        self.steps = np.zeros(n, np.int64)
+        self.y = np.full(n, float(W.HEIGHT // 2))
+        self.cy = np.full(n, W.HEIGHT // 2, np.int64)    # capy_rect.centery
+        self.v = np.zeros(n)
+        self.score = np.zeros(n, np.int64)
+        self.last_flap = np.full(n, -W.MIN_FLAP_INTERVAL)
+        self.last_char = np.full(n, -W.MIN_CHAR_INTERVAL)
+        self.typed = np.zeros(n, np.int64)
+        self.deadline = np.zeros(n)
+        # pillars: fixed slots per run (at most ~5 are ever on screen)
+        self.alive = np.zeros((n, capacity), bool)
+        self.scored = np.zeros((n, capacity), bool)
+        self.ox = np.zeros((n, capacity))
+        self.gap_y = np.zeros((n, capacity), np.int64)
+        self.gap_size = np.zeros((n, capacity), np.int64)
+        # same draws, same order as GameWorld.reset()
+        self.next_challenge_at = np.array([r.randint(*W.CHALLENGE_EVERY) for r in self.rngs], np.int64)
+        self.next_spacing = np.array([W.OBSTACLE_SPACING_X + r.randint(-W.SPACING_JITTER, W.SPACING_JITTER)
+                                      for r in self.rngs], np.int64)
+
+    def _spacing(self, i):
+        self.next_spacing[i] = W.OBSTACLE_SPACING_X + self.rngs[i].randint(-W.SPACING_JITTER, W.SPACING_JITTER)
+
+    def _spawn(self, i):
+        rng = self.rngs[i]
+        gap_size = rng.randint(*W.GAP_SIZE_RANGE)
+        gap_y = rng.randint(W.GAP_MARGIN, W.HEIGHT - W.GAP_MARGIN)
+        k = int(np.argmin(self.alive[i]))
+        if self.alive[i, k]:
+            raise RuntimeError("pillar pool full; raise capacity")
+        self.alive[i, k] = True; self.scored[i, k] = False
+        self.ox[i, k] = W.SPAWN_OFFSET_X; self.gap_y[i, k] = gap_y; self.gap_size[i, k] = gap_size
+        self._spacing(i)
+
+    def step(self, live):
+        dt = self.dt
+        self.t += dt
+        t = self.t
+        self.steps += live
+        state = self.state
+        half = self.gap_size // 2
+
+        # --- autopilot, decided on the pre-step state (tools/simulate.autopilot) ---
+        play = live & (state == PLAY)
+        ahead = self.alive & (self.ox + W.OBSTACLE_WIDTH >= CAPY_LEFT - AUTOPILOT_LOOKBEHIND)
+        j = np.argmin(np.where(ahead, self.ox, np.inf), axis=1)
+        rows = np.arange(self.n)
+        target = np.where(ahead.any(axis=1),
+                          self.gap_y[rows, j] - half[rows, j] + AUTOPILOT_CLEARANCE, W.HEIGHT / 2)
+        flap = play & (self.y > target) & (self.v > 0)
+        start = live & ((state == START) | (state == READY))
+
+        # --- apply inputs (GameWorld.apply_inputs) ---
+        for i in np.flatnonzero(start):
+            self._spacing(i)                       # enter_play()
+        self.y = np.where(start, self.cy.astype(float), self.y)
+        state[start] = PLAY
+        ok = flap & (t - self.last_flap >= W.MIN_FLAP_INTERVAL)
+        self.v[ok] = W.FLAP_VELOCITY
+        self.last_flap[ok] = t
+        chal = live & (state == CHALLENGE)
+        ok = chal & (t - self.last_char >= W.MIN_CHAR_INTERVAL) & (self.typed < 4)
+        self.typed += ok
+        self.last_char[ok] = t
+
+        # --- play step ---
+        play = live & (state == PLAY)
+        self.v = np.where(play, self.v + W.GRAVITY * dt, self.v)
+        self.y = np.where(play, self.y + self.v * dt, self.y)
+        self.cy = np.where(play, self.y.astype(np.int64), self.cy)
+        p2 = play[:, None]
+        self.ox = np.where(p2 & self.alive, self.ox - W.SCROLL_SPEED * dt, self.ox)
+        self.alive &= ~(p2 & (self.ox + W.OBSTACLE_WIDTH <= -50))
+
+        has = self.alive.any(axis=1)
+        last_x = np.where(self.alive, self.ox, -np.inf).max(axis=1)
+        need = play & (~has | (last_x <= W.WIDTH - self.next_spacing))
+        for i in np.flatnonzero(need):
+            self._spawn(i)
+
+        top = self.cy - CAPY_HALF_H
+        bottom = top + W.CAPY_HITBOX[1]
+        half = self.gap_size // 2
+        left = self.ox.astype(np.int64) + W.OBSTACLE_HITBOX_INSET_X
+        cols = self.alive & (CAPY_LEFT < left + HITBOX_W) & (CAPY_RIGHT > left)
+        hit_top = cols & (top[:, None] < self.gap_y - half) & (bottom[:, None] > 0)
+        hit_bot = cols & (top[:, None] < W.HEIGHT) & (bottom[:, None] > self.gap_y + half)
+        crash = play & ((hit_top | hit_bot).any(axis=1) | (top <= -50) | (bottom >= W.HEIGHT))
+        state[crash] = OVER
+
+        newly = p2 & self.alive & ~self.scored & (self.ox + W.OBSTACLE_WIDTH < CAPY_LEFT)
+        self.score += newly.sum(axis=1)
+        self.scored |= newly
+
+        for i in np.flatnonzero(play & (state == PLAY) & (self.score >= self.next_challenge_at)):
+            W.random_code(self.rngs[i], 4)         # start_challenge(): consume the code draws
+            state[i] = CHALLENGE
+            self.typed[i] = 0
+            self.deadline[i] = t + W.CHALLENGE_TIME_LIMIT
+
+        # --- challenge step (autopilot always types the right code) ---
+        for i in np.flatnonzero(chal & (self.typed == 4)):
+            state[i] = READY
+            self.alive[i] = False
+            self.v[i] = 0.0
+            self._spacing(i)
+            self.next_challenge_at[i] = self.score[i] + self.rngs[i].randint(*W.CHALLENGE_EVERY)
+        state[chal & (self.typed < 4) & (t > self.deadline)] = OVER
+
+    PER_RUN = ("ids", "state", "steps", "y", "cy", "v", "score", "last_flap", "last_char", "typed",
+               "deadline", "alive", "scored", "ox", "gap_y", "gap_size", "next_challenge_at", "next_spacing")
+
+    def _compact(self, keep):
+        """Drop finished runs from every per-run array so the long tail steps only live runs."""
+        for name in self.PER_RUN:
+            setattr(self, name, getattr(self, name)[keep])
+        self.rngs = [r for r, k in zip(self.rngs, keep) if k]
+        self.n = len(self.rngs)
+
+    def run(self, max_seconds=300.0):
+        """Step until every run is over or capped; returns (scores, steps) in seed order."""
+        limit = int(max_seconds * self.hz)
+        scores = np.zeros(self.n, np.int64)
+        steps = np.zeros(self.n, np.int64)
+        while self.n:
+            live = (self.state != OVER) & (self.steps < limit)
+            if live.sum() * 2 <= self.n:
+                done = ~live
+                scores[self.ids[done]] = self.score[done]
+                steps[self.ids[done]] = self.steps[done]
+                self._compact(live)
+                continue
+            self.step(live)
+        return scores, steps
+
+def scalar_results(seeds, hz, max_seconds):
+    out = []
+    for s in seeds:
+        world = W.GameWorld(seed=s)
+        steps = play_run(world, hz, max_seconds)
+        out.append((world.score, steps))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--runs", type=int, default=10000)
+    ap.add_argument("--hz", type=int, default=120)
+    ap.add_argument("--max-seconds", type=float, default=300.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--verify", type=int, default=0, help="check the first N runs against GameWorld")
+    args = ap.parse_args(argv)
+
+    seeds = list(range(args.seed, args.seed + args.runs))
+    t0 = time.perf_counter()
+    sim = BatchSim(seeds, args.hz)
+    scores, steps = sim.run(args.max_seconds)
+    elapsed = time.perf_counter() - t0
+    print(f"runs {args.runs}, scores min/mean/p99/max {scores.min()}/{scores.mean():.1f}/"
+          f"{np.percentile(scores, 99):.0f}/{scores.max()}")
+    print(f"{elapsed:.2f} s -> {args.runs / elapsed:,.0f} runs/s, {steps.sum() / elapsed:,.0f} run-steps/s")
+
+    if args.verify:
+        n = min(args.verify, args.runs)
+        ref = scalar_results(seeds[:n], args.hz, args.max_seconds)
+        bad = [(s, r, (int(scores[k]), int(steps[k]))) for k, (s, r) in enumerate(zip(seeds[:n], ref))
+               if r != (int(scores[k]), int(steps[k]))]
+        for s, r, b in bad[:10]:
+            print(f"seed {s}: scalar score/steps {r}, batch {b}")
+        print(f"verify: {n - len(bad)}/{n} runs identical")
+        return 1 if bad else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""
+Headless rendering benchmarks for every game state and the known hot paths.
+
+    python tools/bench.py [--frames 300] [--out bench.json] [--baseline old.json] [name ...]
+
+Runs under the SDL dummy video driver: imports the game, puts WORLD into each
+state (start, ready, play with 0-5 pillars, challenge with both keyboard
+modes, gameover; play and challenge again at each lower quality tier) and
+times render_frame() + present, then micro-benchmarks
+make_pillar_surface, draw_challenge_overlay, draw_mute_button,
+draw_distorted_code, get_keyboard_layout and handle_keyboard_click, and the
+world's obstacle step (move, retire, spawn, score) and collision test with 5
+pillars, both expected to allocate nothing, plus the pixel-accurate (mask)
+collision test. It also reports the capybara's RotationTable: the per-frame
+cost of transform.rotate() against the table lookup that replaced it.
+
+Per case it records frame-time percentiles (ms), Python allocations per frame
+(tracemalloc blocks and peak KiB, measured in a separate pass so they don't
+skew the timings, after a traced warm-up so they don't depend on which cases
+ran before) and text rasterizations per frame (TextCache misses).
+--out writes the results as JSON; --baseline compares against a saved file
+and exits non-zero when any case got slower than --tolerance (p50 or p95)
+or allocates more than before.
+"""
+import argparse, gc, json, os, platform, sys, time, tracemalloc
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # game folder
+
+import pygame
+
+FORMAT = 1
+NOISE_FLOOR_MS = 0.02   # slowdowns smaller than this are timer noise, never regressions
+WARMUP_BATCHES = 10     # traced warm-up batches at most before allocations are counted
+
+
+def percentile(samples, p):
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(p / 100.0 * len(s)))]
+
+
+def _traced(frame, n):
+    """(blocks allocated and still alive, peak KiB) over 'n' frame() calls; tracemalloc must be on."""
+    own = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    blocks = peak = 0
+    for _ in range(n):
+        snap0 = tracemalloc.take_snapshot().filter_traces(own)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        frame()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        snap1 = tracemalloc.take_snapshot().filter_traces(own)
+        blocks += sum(max(0, d.count_diff) for d in snap1.compare_to(snap0, "lineno"))
+    return blocks, peak
+
+
+def measure(frame, frames, warmup=20):
+    """Time 'frame()' calls; then count its allocations in a second, traced pass."""
+    import main as game
+    for _ in range(warmup):
+        frame()
+    times = []
+    misses0 = game.TEXT.misses
+    gc.disable()
+    try:
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            frame()
+            times.append((time.perf_counter() - t0) * 1000.0)
+    finally:
+        gc.enable()
+    text_misses = game.TEXT.misses - misses0
+
+    traced = min(frames, 50)
+    tracemalloc.start()
+    # One-time allocations (tracemalloc's own first snapshots and filters, caches
+    # filled on the first traced call) would land on whichever case runs first:
+    # trace warm-up batches until they stop shrinking, then count in a fresh
+    # session, so a case counts the same alone or in a full run.
+    settle = max(1, traced // 5)
+    last = None
+    for _ in range(WARMUP_BATCHES):
+        blocks, _ = _traced(frame, settle)
+        if last is not None and blocks >= last:
+            break
+        last = blocks
+    tracemalloc.stop()
+    tracemalloc.start()
+    blocks, peak = _traced(frame, traced)
+    tracemalloc.stop()
+
+    return {
+        "frames": frames,
+        "mean_ms": round(sum(times) / len(times), 4),
+        "p50_ms": round(percentile(times, 50), 4),
+        "p95_ms": round(percentile(times, 95), 4),
+        "p99_ms": round(percentile(times, 99), 4),
+        "max_ms": round(max(times), 4),
+        "alloc_blocks_per_frame": round(blocks / traced, 1),
+        "alloc_peak_kib": round(peak / 1024, 1),
+        "text_renders_per_frame": round(text_misses / frames, 3),
+    }
+
+
+# ---------- game states ----------
+FRAME_DT = 1.0 / 60
+TIMER_CYCLE = 12        # frames: the challenge clock loops over 0.2 s, two timer labels, so
+                        # the text cache is warm after warm-up whichever case ran first
+
+def _pillars(world, n):
+    """n pillars spread across the screen with varied gaps (deterministic)."""
+    from world import WIDTH, OBSTACLE_WIDTH, GAP_MARGIN, HEIGHT
+    world.obstacles.clear()
+    step = (WIDTH + OBSTACLE_WIDTH) / max(1, n)
+    for i in reversed(range(n)):   # oldest (leftmost) first, as spawned
+        x = WIDTH - i * step
+        gap_y = GAP_MARGIN + (i * 97) % (HEIGHT - 2 * GAP_MARGIN)
+        world.obstacles.spawn(x, gap_y, 150 + (i * 7) % 31).px = x + 1.25
+
+
+def state_frame(state, pillars=0, keyboard="letters", quality="high"):
+    import main as game
+    game.set_quality(quality)
+    world = game.WORLD
+    world.reset(seed=1)
+    world.score = 37
+    if state in ("play", "ready", "challenge", "gameover"):
+        world.enter_play()
+        _pillars(world, pillars)
+    world.state = state
+    if state == "challenge":
+        world.start_challenge()
+        world.events.clear()
+        world.challenge["typed"] = world.challenge["code"][:2]
+        game.keyboard_mode = keyboard
+    elif state == "gameover":
+        world.gameover_time = world.time - 2.0   # "try again" line visible
+    game.DIRTY.invalidate()
+    tick = [0]
+    t0 = world.time
+
+    def frame():
+        # advance what moves on screen without running the rules
+        tick[0] += 1
+        if state == "challenge":
+            world.time = t0 + (tick[0] % TIMER_CYCLE) * FRAME_DT
+        else:
+            world.time += FRAME_DT
+        if state == "play":
+            world.capy_movement = -600.0 + (tick[0] * 37) % 1500   # sweeps the tilt table
+            for ob in world.obstacles:
+                ob.px = ob.x
+        game.SIM.acc = (tick[0] % 8) / 8 * game.SIM.dt        # varying interpolation alpha
+        game.render_frame()
+        game.DIRTY.present()
+    return frame
+
+
+def cases():
+    import main as game
+    import pillars
+    from masks import MaskCollider
+    out = {
+        "state.start": lambda: state_frame("start"),
+        "state.ready": lambda: state_frame("ready", pillars=2),
+    }
+    for n in range(6):
+        out[f"state.play.{n}_pillars"] = (lambda n=n: state_frame("play", pillars=n))
+    for mode in ("letters", "numbers"):
+        out[f"state.challenge.{mode}"] = (lambda mode=mode: state_frame("challenge", pillars=3, keyboard=mode))
+    out["state.gameover"] = lambda: state_frame("gameover", pillars=3)
+    for tier in game.QUALITY_TIERS[1:]:
+        out[f"state.play.5_pillars.{tier.name}"] = (lambda name=tier.name: state_frame("play", pillars=5, quality=name))
+        out[f"state.challenge.letters.{tier.name}"] = (
+            lambda name=tier.name: state_frame("challenge", pillars=3, keyboard="letters", quality=name))
+
+    # ---------- hot functions ----------
+    def make_pillar_surface():
+        gaps = [(100 + (i * 53) % 400, 150 + i % 31) for i in range(64)]
+        i = [0]
+        def frame():
+            gap_y, gap_size = gaps[i[0] % len(gaps)]
+            i[0] += 1
+            pillars.make_pillar_surface(gap_y, gap_size, 60, game.HEIGHT)
+        return frame
+    out["fn.make_pillar_surface"] = make_pillar_surface
+
+    def overlay():
+        state_frame("challenge", pillars=0)
+        t0 = game.WORLD.time
+        tick = [0]
+        def frame():
+            tick[0] += 1
+            game.WORLD.time = t0 + (tick[0] % TIMER_CYCLE) * FRAME_DT
+            game.draw_challenge_overlay()
+        return frame
+    out["fn.draw_challenge_overlay"] = overlay
+
+    def mute():
+        def frame():
+            game.is_muted = not game.is_muted
+            game.draw_mute_button()
+        return frame
+    out["fn.draw_mute_button"] = mute
+
+    out["fn.draw_distorted_code"] = lambda: (lambda: game.draw_distorted_code("K7QZ", 270))
+    out["fn.get_keyboard_layout"] = lambda: game.get_keyboard_layout
+
+    def keyboard_click():
+        taps = [(x, y) for y in range(330, 600, 23) for x in range(3, 400, 17)]
+        i = [0]
+        def frame():
+            game.keyboard_mode = "letters"
+            game.handle_keyboard_click(taps[i[0] % len(taps)])
+            i[0] += 1
+            game.INPUTS.clear()
+        return frame
+    out["fn.handle_keyboard_click"] = keyboard_click
+
+    def obstacle_step():
+        world = game.WORLD
+        world.reset(seed=1)
+        world.enter_play()
+        def frame():
+            world.time += FRAME_DT
+            world.update_obstacles(FRAME_DT)
+            world.maybe_spawn_by_distance()
+            world.score_passed()
+            world.events.clear()
+        return frame
+    out["sim.obstacle_step"] = obstacle_step
+
+    def collision(collider=None):
+        world = game.WORLD
+        world.reset(seed=1)
+        world.enter_play()
+        world.collider = collider
+        _pillars(world, 5)
+        ys = list(range(40, game.HEIGHT - 40, 7))
+        i = [0]
+        def frame():
+            world.capy_rect.centery = ys[i[0] % len(ys)]
+            world.capy_movement = -600.0 + (i[0] * 37) % 1500   # sweeps the mask angles
+            i[0] += 1
+            world.check_collision_single_column()
+        return frame
+    out["sim.collision"] = collision
+    out["sim.collision_mask"] = lambda: collision(MaskCollider(game.CAPY_ROT, game.CAPY_TILT, game.PILLARS))
+    return out
+
+
+# ---------- baseline comparison ----------
+def compare(results, baseline, tolerance):
+    """Lines describing regressions against 'baseline' (empty when none)."""
+    bad = []
+    for name, cur in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            limit = old[key] * (1.0 + tolerance)
+            if cur[key] > limit and cur[key] - old[key] > NOISE_FLOOR_MS:
+                bad.append(f"{name}: {key} {old[key]:.3f} -> {cur[key]:.3f} ms "
+                           f"(+{(cur[key] / old[key] - 1) * 100:.0f}%, limit +{tolerance * 100:.0f}%)")
+        for key in ("alloc_blocks_per_frame", "text_renders_per_frame"):
+            if cur[key] > old[key] * (1.0 + tolerance) + 1.0:
+                bad.append(f"{name}: {key} {old[key]} -> {cur[key]}")
+    return bad
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("names", nargs="*", help="run only cases whose name starts with one of these")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--out", help="write results as JSON")
+    ap.add_argument("--baseline", help="JSON from an earlier --out to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown, fraction (default 0.3)")
+    args = ap.parse_args(argv)
+
+    pygame.init()
+    import main as game  # sets the display mode and loads assets
+    game.CAPY_ROT.warm()  # the game warms it in the background; measure steady state
+    import pillars
+
+    results = {}
+    for name, setup in cases().items():
+        if args.names and not any(name.startswith(n) for n in args.names):
+            continue
+        r = measure(setup(), args.frames)
+        results[name] = r
+        print(f"{name:32s} p50 {r['p50_ms']:7.3f}  p95 {r['p95_ms']:7.3f}  p99 {r['p99_ms']:7.3f} ms  "
+              f"{r['alloc_blocks_per_frame']:6.1f} blocks  {r['text_renders_per_frame']:.2f} text/frame")
+    rotate_s, table_s = game.CAPY_ROT.measure()
+    print(f"{game.CAPY_ROT.report()}; rotate {rotate_s * 1000:.3f} ms, lookup {table_s * 1000:.4f} ms per frame")
+
+    report = {
+        "format": FORMAT,
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "pillar_backend": pillars.BACKEND,
+            "dirty_rects": game.DIRTY.enabled,
+            "frames": args.frames,
+            "capy_rotate_ms": rotate_s * 1000.0,
+            "capy_rotation_table_ms": table_s * 1000.0,
+        },
+        "results": results,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+        print(f"wrote {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        bad = compare(results, baseline, args.tolerance)
+        if bad:
+            print(f"\nREGRESSION vs {args.baseline}:")
+            for line in bad:
+                print("  " + line)
+            return 1
+        print(f"no regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
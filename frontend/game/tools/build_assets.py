@@ -0,0 +1,129 @@
+"""
+Build-time asset pipeline: pre-scaled images + manifest + bundle size budget.
+
+    python tools/build_assets.py [--budget-kib 1024] [--check]
+
+Source art lives in ignore/art/ (pygbag never packs an ignore/ folder). Each
+image main.py uses is scaled once here to the exact size it is drawn at,
+written to assets/gen/ (JPEG for opaque art, PNG with alpha otherwise) and
+listed in assets/gen/manifest.json, which load_img() reads so the game skips
+loading the full-size files and scaling them on boot. Unused source art
+(blue.png) is simply not listed.
+
+Scaling uses pygame.transform.scale, like the game did at runtime, so PNG
+outputs are pixel-identical to the old boot path. With Pillow installed PNGs
+are also re-saved with optimize=True.
+
+Afterwards it totals every file pygbag would pack (same ignore rules) and
+exits non-zero when that exceeds the budget. --check only reports.
+"""
+import argparse, json, os, sys
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+GAME = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(GAME))  # game folder
+
+import pygame
+
+from world import WIDTH, HEIGHT
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+SRC_DIR = GAME / "ignore" / "art"
+GEN_DIR = GAME / "assets" / "gen"
+MANIFEST = GEN_DIR / "manifest.json"
+FORMAT = 1
+
+# name -> size main.py draws it at, and the output format
+IMAGES = {
+    "capy back.png":   {"size": (WIDTH, HEIGHT), "format": "jpg"},   # opaque background
+    "flappy capy.png": {"size": (60, 45),        "format": "png"},   # sprite, needs alpha
+}
+
+BUDGET_KIB = 1024   # everything pygbag packs; the build prints the current total
+
+# mirrors pygbag's filtering.py: top-level folders and extensions it never packs
+PYGBAG_IGNORE_DIRS = {".mypy_cache", ".ssh", ".local", ".config", ".git", ".github", ".vscode", ".idea",
+                      ".venv", ".tox", "dist", "build", "venv", "ignore", "static", "ATTIC"}
+PYGBAG_SKIP_EXT = {"lnk", "pyc", "pyx", "pyd", "pyi", "exe", "bak", "log", "blend", "ds_store"}
+
+
+def out_name(name, size, fmt):
+    stem = Path(name).stem.replace(" ", "_")
+    return f"{stem}_{size[0]}x{size[1]}.{fmt}"
+
+
+def build_image(name, spec):
+    src = SRC_DIR / name
+    size = tuple(spec["size"])
+    fmt = spec["format"]
+    surf = pygame.image.load(str(src))
+    if surf.get_size() != size:
+        surf = pygame.transform.scale(surf, size)
+    dest = GEN_DIR / out_name(name, size, fmt)
+    if fmt == "jpg":
+        pygame.image.save(surf.convert(), str(dest))
+    else:
+        pygame.image.save(surf.convert_alpha(), str(dest))
+        if Image is not None:
+            Image.open(dest).save(dest, optimize=True)
+    return {
+        "file": dest.name,
+        "size": list(size),
+        "alpha": fmt == "png",
+        "bytes": dest.stat().st_size,
+        "source_bytes": src.stat().st_size,
+    }
+
+
+def bundle_files():
+    """(relative path, bytes) of every file pygbag would pack from the game folder."""
+    out = []
+    for folder, dirs, files in os.walk(GAME):
+        rel = Path(folder).relative_to(GAME)
+        if rel.parts and rel.parts[0] in PYGBAG_IGNORE_DIRS:
+            dirs[:] = []
+            continue
+        for f in files:
+            if f == ".gitignore" or f.rsplit(".", 1)[-1].lower() in PYGBAG_SKIP_EXT:
+                continue
+            out.append(((rel / f).as_posix(), (Path(folder) / f).stat().st_size))
+    return sorted(out, key=lambda e: -e[1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--budget-kib", type=int, default=BUDGET_KIB)
+    ap.add_argument("--check", action="store_true", help="only report the bundle size, build nothing")
+    args = ap.parse_args(argv)
+
+    if not args.check:
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        GEN_DIR.mkdir(parents=True, exist_ok=True)
+        for old in GEN_DIR.iterdir():
+            old.unlink()
+        images = {}
+        for name, spec in IMAGES.items():
+            e = images[name] = build_image(name, spec)
+            print(f"{name:20s} -> {e['file']:28s} {e['source_bytes'] / 1024:8.1f} KiB -> {e['bytes'] / 1024:6.1f} KiB")
+        MANIFEST.write_text(json.dumps({"format": FORMAT, "images": images}, indent=2, sort_keys=True) + "\n")
+
+    files = bundle_files()
+    total = sum(b for _, b in files)
+    budget = args.budget_kib * 1024
+    print(f"\nbundle: {len(files)} files, {total / 1024:.1f} KiB (budget {args.budget_kib} KiB)")
+    for path, b in files[:8]:
+        print(f"  {b / 1024:8.1f} KiB  {path}")
+    if total > budget:
+        print(f"OVER BUDGET by {(total - budget) / 1024:.1f} KiB")
+        return 0 if args.check else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Input-to-photon latency harness: how long a tap takes to reach the screen.
+
+    python tools/latency.py [--fps 30 60 120] [--taps 40] [--mode both|stamped|legacy] [--seed 1]
+
+Runs the real game loop (main.main()) headless under the SDL dummy drivers
+with the frame cap set to each frame rate. A second thread plays the
+player: at a random moment it posts a tap (alternately MOUSEBUTTONDOWN and
+KEYDOWN space), carrying no timestamp, exactly like a real one, so the
+game's own frame wait (IdleScheduler.wait) has to notice and stamp it.
+Pillars are switched off and taps only come when the capybara is falling
+below mid-screen, so every tap is a flap that changes direction on screen.
+
+Per frame rate and flap mode it reports, from the tap's time:
+  - velocity: until GameWorld.try_flap() actually changes the velocity
+  - photon:   until the first presented frame that draws the sprite on a
+              higher row than it would be without the flap (a ghost
+              integrated with the game's own physics)
+  - stamp:    the game's stamp minus the real tap time (how late the frame
+              wait noticed the tap)
+  - step-tap: simulated time of the step the flap landed in minus the
+              game's stamp; its spread is how much a flap's effect depends
+              on when in the frame the tap arrived
+"stamped" applies taps at their time (main.FLAPS), "legacy" at the first
+step of the next frame, as the game did before.
+"""
+import argparse, asyncio, os, random, sys, threading, time
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # game folder
+
+import pygame
+
+MIN_TAP_GAP = 0.35   # seconds between taps, well above the world's flap rate limit
+
+
+def percentile(samples, p):
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(p / 100.0 * len(s)))]
+
+
+class _Done(Exception):
+    pass
+
+
+class Tapper(threading.Thread):
+    """The player: starts the run, then taps at random moments while the capybara falls."""
+
+    def __init__(self, game, fps, taps, rng):
+        super().__init__(daemon=True)
+        self.game = game
+        self.period = 1.0 / fps
+        self.taps_left = taps
+        self.rng = rng
+        self.taps = []          # perf_counter() time of each posted tap
+        self.done = False
+        self.stop = False
+
+    def _want_tap(self):
+        w = self.game.WORLD
+        return (w.state == "play" and w.capy_movement > 0 and w.capy_y > self.game.HEIGHT / 2
+                and not self.game.FLAPS and (not self.taps or time.perf_counter() - self.taps[-1] >= MIN_TAP_GAP))
+
+    def run(self):
+        time.sleep(0.2)
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        while self.taps_left and not self.stop:
+            if not self._want_tap():
+                time.sleep(0.001)
+                continue
+            time.sleep(self.rng.uniform(0.0, self.period))   # any phase of the frame
+            if len(self.taps) % 2:
+                ev = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+            else:
+                ev = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                        pos=(self.game.WIDTH // 2, self.game.HEIGHT // 2))
+            self.taps.append(time.perf_counter())
+            pygame.event.post(ev)
+            self.taps_left -= 1
+        time.sleep(0.2)         # let the last flap reach the screen
+        self.done = True
+
+
+class StopClock:
+    """main.CLOCK stand-in that ends the session once the tapper is done."""
+
+    def __init__(self, clock, tapper):
+        self.clock = clock
+        self.tapper = tapper
+
+    def tick(self, framerate=0):
+        if self.tapper.done:
+            raise _Done()
+        return self.clock.tick(framerate)
+
+
+def run(game, fps, taps, stamped, seed):
+    """One session at 'fps'; (velocity, photon, stamp, step-tap) samples in seconds."""
+    world = game.WORLD
+    world.reset(seed)
+    world.state = "ready"
+    world.maybe_spawn_by_distance = lambda: None   # nothing to crash into
+    game.FLAPS.stamped = stamped
+    game.FLAPS.clear()
+    del game.FLAPS.lags[:]
+    game.INPUTS.clear()
+    game.last_time = time.perf_counter()
+    game.FRAME_CAP = fps
+    game.QUALITY.lock(0)
+    game.QUALITY_TIER = game.QUALITY_TIERS[0]._replace(fps=fps)
+
+    stamps = []                  # the game's time for each queued tap
+    flaps_push = type(game.FLAPS).push
+
+    def push(t):
+        stamps.append(t)
+        flaps_push(game.FLAPS, t)
+    game.FLAPS.push = push
+
+    # The ghost follows the capybara but ignores the latest flap: a frame shows the
+    # flap once the sprite is drawn on a higher pixel row than the ghost would be.
+    applied = []                 # perf_counter() when the world changed velocity
+    ghost = {"y": 0.0, "prev": 0.0, "v": 0.0}
+    world_flap = type(world).try_flap
+    world_play_step = type(world).play_step
+
+    def try_flap():
+        before = world.last_flap_time
+        v = world.capy_movement
+        world_flap(world)
+        if world.last_flap_time != before:
+            applied.append(time.perf_counter())
+            ghost["y"] = world.capy_y
+            ghost["v"] = v
+    world.try_flap = try_flap
+
+    def play_step(dt):
+        ghost["prev"] = ghost["y"]
+        ghost["v"] += game.GRAVITY * dt
+        ghost["y"] += ghost["v"] * dt
+        world_play_step(world, dt)
+        if not applied:
+            ghost["y"], ghost["prev"], ghost["v"] = world.capy_y, world.prev_capy_y, world.capy_movement
+    world.play_step = play_step
+
+    shown = [0]                  # flaps visible in the frame being rendered
+    presents = []                # (perf_counter(), flaps visible) per presented frame
+    rot_blit = type(game.CAPY_ROT).blit
+
+    def blit(target, angle, center):
+        if world.state == "play" and applied:
+            alpha = game.SIM.alpha
+            ghost_y = int(ghost["prev"] + (ghost["y"] - ghost["prev"]) * alpha)
+            if center[1] < ghost_y:
+                shown[0] = len(applied)
+        return rot_blit(game.CAPY_ROT, target, angle, center)
+    game.CAPY_ROT.blit = blit
+
+    frames_presented = type(game.FRAMES).presented
+
+    def presented(t):
+        presents.append((t, shown[0]))
+        frames_presented(game.FRAMES, t)
+    game.FRAMES.presented = presented
+
+    tapper = Tapper(game, fps, taps, random.Random(seed))
+    clock = game.CLOCK
+    game.CLOCK = StopClock(clock, tapper)
+    tapper.start()
+    try:
+        asyncio.run(game.main())
+    except _Done:
+        pass
+    finally:
+        tapper.stop = True
+        game.CLOCK = clock
+        del world.try_flap, world.play_step, world.maybe_spawn_by_distance, game.CAPY_ROT.blit
+        del game.FRAMES.presented, game.FLAPS.push
+    if world.state != "play":
+        raise RuntimeError(f"run ended in state {world.state!r} at {fps} fps")
+
+    velocity, photon = [], []
+    stamp = [st - t for t, st in zip(tapper.taps, stamps) if st is not None]
+    for i, t in enumerate(tapper.taps):
+        after = [a for a in applied if a >= t]
+        if after:
+            velocity.append(after[0] - t)
+        seen = [tp for tp, n in presents if n > i]
+        if seen:
+            photon.append(seen[0] - t)
+    return velocity, photon, stamp, list(game.FLAPS.lags)
+
+
+def fmt(samples):
+    if not samples:
+        return "       -       -"
+    return f"{percentile(samples, 50) * 1000:8.1f}{percentile(samples, 95) * 1000:8.1f}"
+
+
+def main(argv):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--fps", type=int, nargs="+", default=[30, 60, 120])
+    ap.add_argument("--taps", type=int, default=40)
+    ap.add_argument("--mode", choices=("both", "stamped", "legacy"), default="both")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    import main as game
+    modes = {"both": (True, False), "stamped": (True,), "legacy": (False,)}[args.mode]
+    print(f"sim {game.SIM_HZ} Hz; ms from tap          velocity p50/p95  photon p50/p95   stamp p50/p95  step-tap range")
+    for fps in args.fps:
+        for stamped in modes:
+            velocity, photon, stamp, lags = run(game, fps, args.taps, stamped, args.seed)
+            spread = (f"{min(lags) * 1000:7.1f} .. {max(lags) * 1000:5.1f}" if lags else "-")
+            print(f"{fps:4d} fps  {'stamped' if stamped else 'legacy ':8s}  {len(velocity):3d} flaps "
+                  f"{fmt(velocity)}  {fmt(photon)}  {fmt(stamp)}   {spread}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
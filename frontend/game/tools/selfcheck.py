@@ -0,0 +1,451 @@
+"""
+Headless consistency checks for the game's fast paths.
+
+    SDL_VIDEODRIVER=dummy python tools/selfcheck.py [name ...]
+
+Each check compares an optimized code path against the reference one and
+exits non-zero on any mismatch.
+"""
+import os, sys
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # game folder
+
+import pygame
+
+WIDTH, HEIGHT = 400, 600
+
+
+def check_pillar_backends():
+    """numpy and pure-python pillar renderers must produce identical pixels."""
+    import pillars
+    if pillars.load_numpy() is None:
+        return "skipped (numpy not installed)"
+    bad = 0
+    for gap_y in range(100, HEIGHT - 100 + 1, 25):
+        for gap_size in (150, 165, 180):
+            bad += pillars.compare_backends(gap_y, gap_size, 60, HEIGHT)
+    assert bad == 0, f"{bad} pixels differ between backends"
+    return "ok"
+
+
+def _nonzero_pixels(surf):
+    black = pygame.mask.from_threshold(surf, (0, 0, 0, 255), (1, 1, 1, 255))
+    return surf.get_width() * surf.get_height() - black.count()
+
+
+def check_pillar_renderer():
+    """PillarRenderer must draw make_pillar_surface()'s pixels, but for the specular band's ramp."""
+    import pillars
+    width, tolerance = 60, 12    # the band's ramp spans the column, not the section: a few levels off
+    band = pygame.Rect(int(width * 0.35), 0, max(2, width // 10), HEIGHT)
+    renderer = pillars.PillarRenderer(width, HEIGHT)
+    sky = (70, 130, 180)
+    pairs = 0
+    for gap_y in range(100, HEIGHT - 100 + 1, 5):
+        for gap_size in (150, 165, 180):
+            ref = pygame.Surface((width, HEIGHT)); ref.fill(sky)
+            ref.blit(pillars.make_pillar_surface(gap_y, gap_size, width, HEIGHT), (0, 0))
+            got = pygame.Surface((width, HEIGHT)); got.fill(sky)
+            renderer.draw(got, 0, gap_y, gap_size)
+            diff = ref.copy()
+            diff.blit(got, (0, 0), special_flags=pygame.BLEND_RGB_SUB)
+            got.blit(ref, (0, 0), special_flags=pygame.BLEND_RGB_SUB)
+            diff.blit(got, (0, 0), special_flags=pygame.BLEND_RGB_MAX)   # |ref - got| per channel
+            over = diff.copy()
+            over.fill((tolerance,) * 3, special_flags=pygame.BLEND_RGB_SUB)
+            assert _nonzero_pixels(over) == 0, f"gap {gap_y}/{gap_size}: off by more than {tolerance}"
+            diff.fill((0, 0, 0), band)
+            outside = _nonzero_pixels(diff)
+            assert outside == 0, f"gap {gap_y}/{gap_size}: {outside} pixels differ outside the band"
+            pairs += 1
+    return f"ok ({pairs} pillars, band within {tolerance})"
+
+
+def check_dirty_rects():
+    """Dirty-rect frames must match a full redraw pixel for pixel."""
+    import random
+    from dirty import DirtyRenderer
+    screen = pygame.display.get_surface()
+    bg = pygame.Surface((WIDTH, HEIGHT))
+    for y in range(HEIGHT):
+        pygame.draw.line(bg, (y % 256, 100, 200), (0, y), (WIDTH - 1, y))
+    sprite = pygame.Surface((40, 30), pygame.SRCALPHA)
+    sprite.fill((255, 0, 0, 120))
+    ref = pygame.Surface((WIDTH, HEIGHT))
+    dirty = DirtyRenderer(screen, bg, enabled=True)
+    rng = random.Random(1)
+    pos = [[rng.randint(0, WIDTH), rng.randint(0, HEIGHT)] for _ in range(5)]
+    bad = 0
+    for _ in range(300):
+        for p in pos:
+            p[0] = (p[0] - 3) % WIDTH
+            p[1] = (p[1] + rng.randint(-6, 6)) % HEIGHT
+        dirty.begin()
+        ref.blit(bg, (0, 0))
+        for p in pos:
+            dirty.mark(screen.blit(sprite, p))
+            ref.blit(sprite, p)
+        dirty.present()
+        if pygame.image.tostring(screen, "RGB") != pygame.image.tostring(ref, "RGB"):
+            bad += 1
+    assert bad == 0, f"{bad} frames differ from full redraw"
+    return "ok"
+
+
+def check_replays():
+    """Recorded runs must re-simulate to the same score and length, bit for bit."""
+    import time
+    from replay import ReplayRecorder, resimulate
+    from simulate import play_run
+    from world import GameWorld
+    sizes = []
+    sim_steps = 0
+    t0 = time.perf_counter()
+    for seed in range(30):
+        world = GameWorld(seed=seed, recorder=ReplayRecorder(120))
+        world.state = "ready"
+        play_run(world, hz=120)
+        data = world.last_replay
+        assert data is not None, f"seed {seed}: no replay recorded"
+        res = resimulate(data)
+        assert res.ok, f"seed {seed}: replay gave {res.score}@{res.steps}, claimed {res.claimed_score}@{res.claimed_steps}"
+        sizes.append(len(data))
+        sim_steps += res.steps
+    elapsed = time.perf_counter() - t0
+    return (f"ok ({len(sizes)} runs, {min(sizes)}-{max(sizes)} bytes, "
+            f"{sim_steps / 120 / elapsed:,.0f}x real time incl. recording)")
+
+
+def check_replay_edges():
+    """Death-step scoring reaches the replay trailer; bogus replays are rejected or end quickly;
+    time idled before the start does not count toward a run's length."""
+    import time
+    from replay import (MAGIC, VERSION, HEADER, MAX_RUN_SECONDS, REPLAY_HZ, ReplayError, ReplayRecorder,
+                        _put_varint, decode, resimulate)
+    from simulate import play_run
+    from world import GameWorld, Inputs, CAPY_X, CAPY_HITBOX, OBSTACLE_WIDTH, SCROLL_SPEED
+
+    # pillar scored in the very step the capybara hits the floor
+    world = GameWorld(seed=7, recorder=ReplayRecorder(REPLAY_HZ))
+    world.state = "ready"
+    start = Inputs(); start.start = True
+    dt = 1.0 / REPLAY_HZ
+    world.step(dt, start)
+    world.capy_y = float(HEIGHT - 2); world.capy_movement = 300.0
+    world.spawning_enabled = False
+    left = CAPY_X - CAPY_HITBOX[0] // 2
+    world.obstacles.clear()
+    world.obstacles.spawn(left - OBSTACLE_WIDTH - 0.5 + SCROLL_SPEED * dt, HEIGHT // 2, 160)
+    world.events.clear()
+    world.step(dt)
+    assert world.state == "gameover" and world.score == 1, f"setup: {world.state} score {world.score}"
+    claimed = decode(world.last_replay).score
+    assert claimed == world.score, f"replay trailer claims {claimed}, world scored {world.score}"
+    sent = [v for kind, v in world.events if kind == "gameover"]
+    assert sent == [world.score], f"gameover event {sent}, score {world.score}"
+
+    def forge(hz, end_step, inputs=b"", count=0):
+        out = bytearray(MAGIC) + HEADER.pack(VERSION, hz, 1, HEIGHT // 2)
+        _put_varint(out, count)
+        out += inputs
+        _put_varint(out, end_step)
+        _put_varint(out, 0)
+        return bytes(out)
+
+    for data, why in ((forge(1, 100), "foreign step rate"),
+                      (forge(REPLAY_HZ, int(MAX_RUN_SECONDS * REPLAY_HZ) + 1), "overlong run")):
+        try:
+            decode(data)
+        except ReplayError:
+            continue
+        raise AssertionError(f"{why} accepted")
+    t0 = time.perf_counter()
+    res = resimulate(forge(REPLAY_HZ, int(MAX_RUN_SECONDS * REPLAY_HZ)))   # never started
+    elapsed = time.perf_counter() - t0
+    assert not res.ok and elapsed < 1.0, f"idle replay: ok={res.ok} after {elapsed:.2f}s"
+
+    # a player who leaves the ready screen up for longer than any run may last, then plays
+    world = GameWorld(seed=11, recorder=ReplayRecorder(REPLAY_HZ))
+    world.state = "ready"
+    idle = int(MAX_RUN_SECONDS * REPLAY_HZ) + 1
+    for _ in range(idle % 1000):
+        world.step(dt)
+    world.steps += idle - idle % 1000          # the bob is all that happens there
+    world.time += (idle - idle % 1000) * dt
+    play_run(world, hz=REPLAY_HZ)
+    rep = decode(world.last_replay)
+    res = resimulate(world.last_replay)
+    assert res.ok, f"late start: replay gave {res.score}@{res.steps}, claimed {rep.score}@{rep.end_step}"
+    return "ok"
+
+
+def check_batch_sim():
+    """The NumPy batch simulator must give each seed the same score and length as GameWorld."""
+    import pillars
+    if pillars.load_numpy() is None:
+        return "skipped (numpy not installed)"
+    from batchsim import BatchSim, scalar_results
+    seeds = list(range(100, 160))
+    scores, steps = BatchSim(seeds, 120).run()
+    ref = scalar_results(seeds, 120, 300.0)
+    bad = [s for k, s in enumerate(seeds) if ref[k] != (int(scores[k]), int(steps[k]))]
+    assert not bad, f"seeds {bad[:5]} differ from GameWorld"
+    return f"ok ({len(seeds)} runs, scores {scores.min()}-{scores.max()})"
+
+
+def check_broad_phase():
+    """Broad-phase collision must agree with testing every pillar, on random layouts and real runs."""
+    import random
+    from simulate import autopilot
+    from world import (GameWorld, Inputs, OBSTACLE_WIDTH, GAP_SIZE_RANGE, GAP_MARGIN,
+                       CAPY_X, CAPY_HITBOX)
+    rng = random.Random(20)
+    world = GameWorld(seed=0)
+    pool = world.obstacles
+    hits = trials = 0
+    for _ in range(20000):
+        pool.clear()
+        x = rng.uniform(-2 * OBSTACLE_WIDTH, CAPY_X)
+        for _ in range(rng.randint(0, 6)):
+            pool.spawn(x, rng.randint(GAP_MARGIN, HEIGHT - GAP_MARGIN), rng.randint(*GAP_SIZE_RANGE))
+            x += rng.uniform(0.0, 2.5 * OBSTACLE_WIDTH)
+        world.capy_rect.center = (CAPY_X + rng.randint(-2, 2) * OBSTACLE_WIDTH // 2,
+                                  rng.randint(-60 - CAPY_HITBOX[1], HEIGHT + CAPY_HITBOX[1]))
+        ref = world.check_collision_all_pillars()
+        assert world.check_collision_single_column() == ref, (
+            f"capy {world.capy_rect}, pillars {[(ob.x, ob.gap_y, ob.gap_size) for ob in pool]}")
+        hits += not ref
+        trials += 1
+    for seed in range(20):
+        world = GameWorld(seed=seed)
+        inputs = Inputs()
+        while world.state != "gameover" and world.time < 120.0:
+            autopilot(world, inputs)
+            world.step(1.0 / 120, inputs)
+            inputs.clear()
+            if world.state == "play":
+                assert world.check_collision_single_column() == world.check_collision_all_pillars(), (
+                    f"seed {seed} step {world.steps}")
+                trials += 1
+    return f"ok ({trials} layouts, {hits} random collisions)"
+
+
+def check_mask_collision():
+    """MaskCollider must agree with overlapping full-screen masks of the drawn sprite and pillars."""
+    import random
+    import main as game
+    from masks import MaskCollider
+    from world import GameWorld, OBSTACLE_WIDTH, GAP_SIZE_RANGE, GAP_MARGIN, CAPY_X
+    collider = MaskCollider(game.CAPY_ROT, game.CAPY_TILT, game.PILLARS)
+    world = GameWorld(seed=0)
+    pool = world.obstacles
+    capy_layer = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    pillar_layer = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    rng = random.Random(21)
+    hits = 0
+    trials = 3000
+    for _ in range(trials):
+        pool.clear()
+        x = rng.uniform(-OBSTACLE_WIDTH, CAPY_X)
+        for _ in range(rng.randint(0, 4)):
+            pool.spawn(x, rng.randint(GAP_MARGIN, HEIGHT - GAP_MARGIN), rng.randint(*GAP_SIZE_RANGE))
+            x += rng.uniform(0.0, 2.5 * OBSTACLE_WIDTH)
+        cx = CAPY_X + rng.randint(-OBSTACLE_WIDTH, OBSTACLE_WIDTH)
+        cy = rng.randint(-20, HEIGHT + 20)
+        velocity = rng.uniform(-game.CAPY_MAX_FALL_SPEED, -game.FLAP_VELOCITY)
+        capy_layer.fill((0, 0, 0, 0))
+        pillar_layer.fill((0, 0, 0, 0))
+        game.CAPY_ROT.blit(capy_layer, -velocity * game.CAPY_TILT, (cx, cy))
+        for ob in pool:
+            game.PILLARS.draw(pillar_layer, int(ob.x), ob.gap_y, ob.gap_size)
+        ref = pygame.mask.from_surface(capy_layer).overlap(pygame.mask.from_surface(pillar_layer), (0, 0)) is not None
+        got = collider.collides(cx, cy, velocity, pool)
+        assert got == ref, f"capy ({cx}, {cy}) v={velocity:.0f}: {got} != {ref}, pillars {[(ob.x, ob.gap_y, ob.gap_size) for ob in pool]}"
+        hits += ref
+    return f"ok ({trials} layouts, {hits} hits, {collider.mask_tests} mask tests)"
+
+
+def check_challenge_clock():
+    """The human check must run out on wall-clock time, however slowly frames come."""
+    import main as game
+    from world import CHALLENGE_TIME_LIMIT
+    world = game.WORLD
+    for label, frames in (("idle at 4 fps", [0.25] * 80), ("hidden tab", [60.0])):
+        world.reset(5)
+        world.enter_play()
+        world.start_challenge()
+        game.SIM.reset()
+        game.INPUTS.clear()
+        wall = 0.0
+        for frame_dt in frames:
+            wall += frame_dt
+            game.simulate(frame_dt, 0.0, False)
+            if world.state != "challenge":
+                break
+        assert world.state == "gameover", f"{label}: still '{world.state}' after {wall:.2f}s of wall time"
+        assert wall <= CHALLENGE_TIME_LIMIT + frames[0], f"{label}: timed out only after {wall:.2f}s"
+    world.reset()
+    world.state = "start"
+    world.events.clear()
+    return "ok"
+
+
+def check_quality_tiers():
+    """Every lower quality tier must cost less per displayed second (play and challenge frames)."""
+    import time
+    import main as game
+    from bench import state_frame
+    costs = []
+    for tier in game.QUALITY_TIERS:
+        per_frame = 0.0
+        for state, pillars in (("play", 5), ("challenge", 5)):
+            frame = state_frame(state, pillars=pillars, quality=tier.name)
+            for _ in range(20):
+                frame()
+            batches = []
+            for _ in range(7):
+                t0 = time.perf_counter()
+                for _ in range(100):
+                    frame()
+                batches.append((time.perf_counter() - t0) / 100)
+            per_frame += min(batches)
+        costs.append((tier.name, per_frame * tier.fps))
+    game.set_quality(0)
+    game.set_quality("auto")
+    for (hi, c_hi), (lo, c_lo) in zip(costs, costs[1:]):
+        assert c_lo < 0.97 * c_hi, f"{lo} costs {c_lo * 1000:.1f} ms/s, {hi} {c_hi * 1000:.1f} ms/s"
+    return "ok (" + ", ".join(f"{name} {c * 1000:.1f}" for name, c in costs) + " ms of work per second)"
+
+
+def check_idle_frames():
+    """Idle REGION and SKIP frames must leave the screen exactly as a full redraw would draw it."""
+    import main as game
+    from idle import IdleScheduler, FULL, REGION, SKIP
+    world, screen = game.WORLD, game.SCREEN
+    idle = IdleScheduler(enabled=True, can_block=False)
+    dirty_enabled = game.DIRTY.enabled
+    game.DIRTY.enabled = True
+    game.DIRTY.invalidate()
+
+    def full_redraw_differs(paused):
+        shown = screen.copy()
+        game.DIRTY.enabled = False
+        game.render_frame(paused)
+        game.DIRTY.enabled = True
+        differs = pygame.image.tostring(shown, "RGB") != pygame.image.tostring(screen, "RGB")
+        screen.blit(shown, (0, 0))
+        return differs
+
+    def frames(label, n, active=True):
+        bad = 0
+        paused = not active and world.state == "play"
+        for _ in range(n):
+            game.simulate(1.0 / 60, 0.0, paused)
+            world.events.clear()
+            mode = idle.plan(active, game.idle_scene(paused), game.idle_region())
+            if mode != SKIP:
+                if mode == REGION:
+                    screen.set_clip(idle.rect)
+                game.render_frame(paused)
+            if mode == FULL:
+                game.DIRTY.present()
+            elif mode == REGION:
+                screen.set_clip(None)
+                game.DIRTY.present_region(idle.rect)
+            bad += full_redraw_differs(paused)
+        assert bad == 0, f"{label}: {bad} of {n} frames differ from a full redraw"
+
+    world.reset(3)
+    frames("title", 150)
+    world.state = "ready"
+    frames("ready", 150)
+    world.enter_play()
+    frames("play", 30)
+    frames("paused", 30, active=False)
+    while world.state == "play":
+        game.simulate(1.0 / 60, 0.0, False)
+    frames("gameover", 150)
+    game.DIRTY.enabled = dirty_enabled
+    game.DIRTY.invalidate()
+    world.reset()
+    world.state = "start"
+    world.events.clear()
+    assert idle.frames[REGION] and idle.frames[SKIP], f"no idle frames to compare: {idle.frames}"
+    return f"ok ({idle.frames[FULL]} full, {idle.frames[REGION]} region, {idle.frames[SKIP]} skipped)"
+
+
+def check_keyboard_grid():
+    """KeyGrid must find the same key as a linear collidepoint() scan, pixel for pixel."""
+    import main as game
+    taps = 0
+    for mode in ("letters", "numbers"):
+        keys, grid = game._keyboard(mode)
+        area = keys[0][1].unionall([rect for _, rect, _, _ in keys]).inflate(20, 20)
+        points = [(x, y) for y in range(area.top, area.bottom) for x in range(area.left, area.right)]
+        points += [(-1, area.centery), (WIDTH, area.centery), (area.centerx, HEIGHT), (area.centerx, -1)]
+        for pos in points:
+            want = next((i for i, (_, rect, _, _) in enumerate(keys) if rect.collidepoint(pos)), -1)
+            got = grid.index_at(pos)
+            assert got == want, f"{mode} keyboard at {pos}: grid key {got}, linear key {want}"
+        taps += len(points)
+    return f"ok ({taps} taps)"
+
+
+def check_bench_allocs():
+    """A case must count the same allocations in tools/bench.py whether it runs alone or after others."""
+    import json, subprocess, tempfile
+    bench = str(Path(__file__).resolve().parent / "bench.py")
+    alone = ("state.play.0", "state.challenge.numbers", "fn.draw_challenge_overlay")
+
+    def allocs(out, *names):
+        subprocess.run([sys.executable, bench, "--frames", "60", "--out", out, *names],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        results = json.loads(Path(out).read_text())["results"]
+        return {name: r["alloc_blocks_per_frame"] for name, r in results.items()}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        together = allocs(os.path.join(tmp, "all.json"), "state", "fn.draw_challenge")
+        for i, name in enumerate(alone):
+            for case, blocks in allocs(os.path.join(tmp, f"{i}.json"), name).items():
+                assert blocks == together[case], \
+                    f"{case}: {blocks} blocks/frame alone, {together[case]} after other cases"
+    return f"ok ({len(together)} cases)"
+
+
+CHECKS = {
+    "pillar_backends": check_pillar_backends,
+    "pillar_renderer": check_pillar_renderer,
+    "dirty_rects": check_dirty_rects,
+    "idle_frames": check_idle_frames,
+    "replays": check_replays,
+    "replay_edges": check_replay_edges,
+    "batch_sim": check_batch_sim,
+    "broad_phase": check_broad_phase,
+    "mask_collision": check_mask_collision,
+    "challenge_clock": check_challenge_clock,
+    "quality_tiers": check_quality_tiers,
+    "keyboard_grid": check_keyboard_grid,
+    "bench_allocs": check_bench_allocs,
+}
+
+
+def main(argv):
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    names = argv or list(CHECKS)
+    failed = 0
+    for name in names:
+        try:
+            result = CHECKS[name]()
+        except AssertionError as e:
+            result = f"FAIL: {e}"
+            failed += 1
+        print(f"{name:24s} {result}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,79 @@
+"""
+Run the headless GameWorld faster than real time with a simple autopilot.
+
+    python tools/simulate.py [--runs N] [--hz 120] [--max-seconds 300]
+
+No display is opened. Prints per-run scores and overall simulation speed.
+"""
+import argparse, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # game folder
+
+from world import GameWorld, Inputs, HEIGHT, OBSTACLE_WIDTH
+
+
+AUTOPILOT_CLEARANCE = 120   # px below the gap top at which to flap (a flap rises ~100 px)
+AUTOPILOT_LOOKBEHIND = 10   # keep steering for a pillar until it is this far past the hitbox
+
+
+def autopilot(world, inputs):
+    """Fill 'inputs' for the next step: start, steer for the next gap, solve the check."""
+    state = world.state
+    if state in ("start", "ready"):
+        inputs.start = True
+    elif state == "play":
+        # flap once falling below the height where a flap's ~100 px rise clears the gap top
+        target = HEIGHT / 2
+        for ob in world.obstacles:
+            if ob.x + OBSTACLE_WIDTH >= world.capy_rect.left - AUTOPILOT_LOOKBEHIND:
+                target = ob.gap_y - ob.gap_size // 2 + AUTOPILOT_CLEARANCE
+                break
+        if world.capy_y > target and world.capy_movement > 0:
+            inputs.flap = True
+    elif state == "challenge":
+        c = world.challenge
+        typed = c["typed"]
+        if c["code"].startswith(typed) and len(typed) < len(c["code"]):
+            inputs.chars.append(c["code"][len(typed)])
+
+
+def play_run(world, hz=120, max_seconds=300.0, bot=autopilot):
+    """Step one run from start to game over (or the time cap); returns steps taken."""
+    dt = 1.0 / hz
+    inputs = Inputs()
+    steps = 0
+    limit = int(max_seconds * hz)
+    while world.state != "gameover" and steps < limit:
+        bot(world, inputs)
+        world.step(dt, inputs)
+        inputs.clear()
+        world.events.clear()
+        steps += 1
+    return steps
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--hz", type=float, default=120.0)
+    ap.add_argument("--max-seconds", type=float, default=300.0)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    total_steps = 0
+    scores = []
+    t0 = time.perf_counter()
+    for i in range(args.runs):
+        world = GameWorld(seed=args.seed + i)
+        total_steps += play_run(world, args.hz, args.max_seconds)
+        scores.append(world.score)
+    elapsed = time.perf_counter() - t0
+    sim_seconds = total_steps / args.hz
+    print(f"runs {args.runs}, scores min/avg/max {min(scores)}/{sum(scores) / len(scores):.1f}/{max(scores)}")
+    print(f"{total_steps} steps in {elapsed:.2f} s -> {total_steps / elapsed:,.0f} steps/s "
+          f"({sim_seconds / elapsed:,.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+# =========================
+#  GAME WORLD (headless)
+# =========================
+# All gameplay state and rules: physics, pillars, scoring, collision and the
+# human check. No display, fonts or audio are touched here (pygame.Rect works
+# without pygame.init()), so the world can be stepped far faster than real time.
+import math, random, string
+
+import pygame
+
+from obstacles import ObstaclePool
+
+WIDTH, HEIGHT = 400, 600
+
+# Time-based physics (device independent)
+GRAVITY = 1800.0        # pixels / s^2   (~0.5 per frame at 60 FPS)
+FLAP_VELOCITY = -600.0  # pixels / s     (~-10 per frame at 60 FPS)
+
+# --- HARDEN: flap rate limit ---
+MAX_FLAPS_PER_SEC = 12.0
+MIN_FLAP_INTERVAL = 1.0 / MAX_FLAPS_PER_SEC
+
+CAPY_X = 100
+CAPY_HITBOX = (35, 25)
+
+# --- Pillars ---
+OBSTACLE_WIDTH = 60
+OBSTACLE_HITBOX_INSET_X = 8   # pixels trimmed from each side for fair collisions
+OBSTACLE_HIT_W = max(2, OBSTACLE_WIDTH - 2*OBSTACLE_HITBOX_INSET_X)
+SCROLL_SPEED   = 150
+SPAWN_OFFSET_X = WIDTH + 60
+OBSTACLE_SPACING_X = 150   # phone-friendly spacing (was 130)
+SPACING_JITTER = 15
+SPAWN_EDGE_GUARD = 40
+OBSTACLE_CULL_X = -50      # a pillar is retired once its right edge reaches this
+GAP_SIZE_RANGE = (150, 180)
+GAP_MARGIN = 100
+
+# --- Human check (bot-hardening config) ---
+MIN_CHAR_INTERVAL = 0.12      # 120 ms between chars
+MAX_STRIKES = 3               # wrong 4-char tries allowed
+CHALLENGE_TIME_LIMIT = 15.0   # 15 seconds
+CHALLENGE_EVERY = (25, 45)    # points between checks
+
+# Allowed character set (matches code generation)
+ALLOWED_CHARS = [d for d in "23456789"] + [c for c in string.ascii_uppercase if c not in ("O","I")]
+
+GAMEOVER_RESTART_DELAY = 1.0  # seconds before a tap restarts
+
+
+# Code alphabet (no O/I, no 0/1); order matters for seeded reproducibility
+CODE_POOL = [c for c in string.ascii_uppercase if c not in ("O","I")] + [d for d in "23456789"]
+
+def random_code(rng, n=4):
+    return "".join(rng.choice(CODE_POOL) for _ in range(n))
+
+
+def new_seed():
+    """Fresh 32-bit run seed."""
+    return random.getrandbits(32)
+
+
+class Inputs:
+    """
+    Player intents collected from events since the last step.
+    The renderer maps raw pygame events onto these; step() consumes them.
+    """
+    __slots__ = ("start", "flap", "restart", "chars", "backspace")
+
+    def __init__(self):
+        self.start = False
+        self.flap = False
+        self.restart = False
+        self.chars = []
+        self.backspace = 0
+
+    def clear(self):
+        self.start = self.flap = self.restart = False
+        if self.chars:
+            self.chars.clear()
+        self.backspace = 0
+
+    def __bool__(self):
+        return self.start or self.flap or self.restart or bool(self.chars) or self.backspace > 0
+
+
+class GameWorld:
+    """
+    Headless game state stepped with step(dt, inputs).
+
+    States: "start", "ready", "play", "challenge", "gameover".
+    Things the renderer must react to (sounds, parent messages, text input)
+    are queued as (kind, value) tuples; read them with drain_events():
+      ("run_start", None), ("score", score), ("challenge", code),
+      ("challenge_passed", None), ("gameover", score), ("reset", None)
+
+    Every run (boot, and each restart) gets its own seed; all randomness
+    comes from a random.Random(seed), so a run is fully reproduced by its
+    seed, the step rate and the inputs given to step(). An optional
+    'recorder' (replay.ReplayRecorder) captures exactly that from the run's
+    start (see begin_run()); the finished run's bytes are left in
+    'last_replay' at game over.
+
+    'profiler' (profiler.FrameProfiler, or None) gets lap()s for the
+    physics, obstacles and collision phases of each play step.
+
+    'obstacles' is an obstacles.ObstaclePool, reused across runs; the play
+    step moves, retires and scores pillars without allocating.
+
+    'collider' (masks.MaskCollider, or None) switches pillar hits from the
+    inset hitbox rects to pixel-accurate sprite masks. Replays assume the
+    default rect test.
+    """
+
+    def __init__(self, seed=None, recorder=None):
+        self.recorder = recorder
+        self.profiler = None
+        self.collider = None
+        self.last_replay = None
+        self.events = []
+        self.capy_rect = pygame.Rect(0, 0, *CAPY_HITBOX)
+        self.obstacles = ObstaclePool(hit_inset=OBSTACLE_HITBOX_INSET_X, hit_w=OBSTACLE_HIT_W, height=HEIGHT)
+        self.challenge = {
+            "code": "",
+            "typed": "",
+            "deadline": 0.0,
+            "active": False,
+            "time_limit": CHALLENGE_TIME_LIMIT,
+            "strikes": 0
+        }
+        self.reset(seed)
+        self.state = "start"
+
+    # ---------- run lifecycle ----------
+    def reset(self, seed=None):
+        """Fresh run (title/ready) with its own seed; mirrors the old reset_game()."""
+        self.seed = new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.time = 0.0               # simulated seconds since the run began
+        self.steps = 0
+        self.started = False          # begin_run() done (a passed challenge resumes from "ready" too)
+        self.capy_rect.center = (CAPY_X, HEIGHT // 2)
+        self.capy_y = float(HEIGHT // 2)
+        self.prev_capy_y = self.capy_y
+        self.capy_movement = 0.0
+        self.obstacles.clear()
+        self.score = 0
+        self.gameover_time = 0.0
+        self.last_flap_time = -MIN_FLAP_INTERVAL
+        self.last_char_time = -MIN_CHAR_INTERVAL
+        self.next_challenge_at = self.next_challenge_increment()
+        c = self.challenge
+        c["active"] = False; c["typed"] = ""; c["code"] = ""; c["deadline"] = 0.0; c["strikes"] = 0
+        self.spawning_enabled = False
+        self.next_spacing_x = OBSTACLE_SPACING_X + self.rng.randint(-SPACING_JITTER, SPACING_JITTER)
+
+    def begin_run(self, dt):
+        """
+        Restart the clock on the run's first step: it reads time=dt, steps=1 there,
+        as if the run had started right after reset, so time idled on the title or
+        ready screen neither counts toward the run's length nor goes into its replay
+        (which keeps the capybara's starting row instead).
+        """
+        self.started = True
+        self.time = dt
+        self.steps = 1
+        if self.recorder is not None:
+            self.recorder.begin(self.seed, self.capy_rect.centery)
+
+    def enter_play(self):
+        self.state = "play"; self.spawning_enabled = True
+        self.next_spacing_x = OBSTACLE_SPACING_X + self.rng.randint(-SPACING_JITTER, SPACING_JITTER)
+        # Sync float position to current sprite position to avoid a jump
+        self.capy_y = float(self.capy_rect.centery)
+        self.prev_capy_y = self.capy_y
+
+    def drain_events(self):
+        ev = self.events
+        self.events = []
+        return ev
+
+    # ---------- input ----------
+    def try_flap(self):
+        if self.time - self.last_flap_time >= MIN_FLAP_INTERVAL:
+            self.capy_movement = FLAP_VELOCITY
+            self.last_flap_time = self.time
+
+    def type_char(self, ch):
+        if ch in ALLOWED_CHARS:
+            if (self.time - self.last_char_time) >= MIN_CHAR_INTERVAL and len(self.challenge["typed"]) < 4:
+                self.challenge["typed"] += ch
+                self.last_char_time = self.time
+
+    def apply_inputs(self, inputs):
+        state = self.state
+        if inputs.start and state in ("start", "ready"):
+            self.enter_play()
+            self.events.append(("run_start", None))
+        elif inputs.flap and state == "play":
+            self.try_flap()
+        elif inputs.restart and state == "gameover":
+            if self.time - self.gameover_time > GAMEOVER_RESTART_DELAY:
+                self.reset(); self.state = "ready"
+                self.events.append(("reset", None))
+        elif state == "challenge":
+            for _ in range(inputs.backspace):
+                self.challenge["typed"] = self.challenge["typed"][:-1]
+            for ch in inputs.chars:
+                self.type_char(ch)
+
+    # ---------- stepping ----------
+    def step(self, dt, inputs=None):
+        self.time += dt
+        self.steps += 1
+        if inputs:
+            if inputs.start and not self.started and self.state in ("start", "ready"):
+                self.begin_run(dt)
+            if self.recorder is not None:
+                self.recorder.record(self.steps, inputs)
+            self.apply_inputs(inputs)
+        state = self.state
+        if state == "play":
+            self.play_step(dt)
+        elif state == "challenge":
+            self.challenge_step()
+        elif state in ("start", "ready"):
+            # idle bob on the title/ready screens (also where the run starts from)
+            self.capy_rect.centery = int(HEIGHT*0.55 + 8*math.sin(self.time*1000*0.005))
+
+    def play_step(self, dt):
+        prof = self.profiler
+        # time-based physics
+        self.prev_capy_y = self.capy_y
+        self.capy_movement += GRAVITY * dt                # v += a*dt
+        self.capy_y += self.capy_movement * dt            # y += v*dt
+        self.capy_rect.centery = int(self.capy_y)         # assign int to Rect
+        if prof: prof.lap("physics")
+
+        self.update_obstacles(dt)
+        self.maybe_spawn_by_distance()
+        if prof: prof.lap("obstacles")
+
+        crashed = not self.check_collision_single_column()
+        if prof: prof.lap("collision")
+
+        self.score_passed()
+        if crashed:
+            # after scoring: a pillar passed on the death step counts in the replay and SCORE
+            self.game_over()
+
+        if self.state == "play" and self.score >= self.next_challenge_at:
+            self.start_challenge()
+
+    def game_over(self):
+        self.state = "gameover"; self.gameover_time = self.time; self.spawning_enabled = False
+        self.challenge["active"] = False
+        if self.recorder is not None:
+            self.last_replay = self.recorder.finish(self.steps, self.score)
+        self.events.append(("gameover", self.score))
+
+    # ---------- pillars ----------
+    def spawn_obstacle(self):
+        last = self.obstacles.last()
+        if last is not None and last.x > SPAWN_OFFSET_X - SPAWN_EDGE_GUARD: return
+        gap_size = self.rng.randint(*GAP_SIZE_RANGE)
+        gap_y = self.rng.randint(GAP_MARGIN, HEIGHT - GAP_MARGIN)
+        self.obstacles.spawn(SPAWN_OFFSET_X, gap_y, gap_size)
+
+    def maybe_spawn_by_distance(self):
+        if not self.spawning_enabled: return
+        if not self.obstacles:
+            self.spawn_obstacle()
+            self.next_spacing_x = OBSTACLE_SPACING_X + self.rng.randint(-SPACING_JITTER, SPACING_JITTER)
+            return
+        if self.obstacles.last().x <= WIDTH - self.next_spacing_x:
+            self.spawn_obstacle()
+            self.next_spacing_x = OBSTACLE_SPACING_X + self.rng.randint(-SPACING_JITTER, SPACING_JITTER)
+
+    def update_obstacles(self, dt):
+        pool = self.obstacles
+        pool.advance(SCROLL_SPEED * dt)
+        while pool.count and pool.first().x + OBSTACLE_WIDTH <= OBSTACLE_CULL_X:
+            pool.retire_front()
+
+    def score_passed(self):
+        """Score pillars whose right edge passed the capybara, oldest first."""
+        pool = self.obstacles
+        left = self.capy_rect.left
+        ob = pool.next_unscored()
+        while ob is not None and (ob.x + OBSTACLE_WIDTH) < left:
+            pool.mark_scored()
+            self.score += 1
+            self.events.append(("score", self.score))
+            ob = pool.next_unscored()
+
+    @staticmethod
+    def obstacle_hitboxes(ob):
+        x = int(ob.x); gap_y = ob.gap_y; gap_size = ob.gap_size
+        inset = OBSTACLE_HITBOX_INSET_X
+        w = OBSTACLE_HIT_W
+        top_rect    = pygame.Rect(x + inset, 0, w, gap_y - gap_size//2)
+        bottom_rect = pygame.Rect(x + inset, gap_y + gap_size//2, w, HEIGHT - (gap_y + gap_size//2))
+        return top_rect, bottom_rect
+
+    def check_collision_single_column(self):
+        """False when the capybara hits a pillar or leaves the screen."""
+        capy_rect = self.capy_rect
+        collider = self.collider
+        if collider is not None:
+            if collider.collides(capy_rect.centerx, capy_rect.centery, self.capy_movement, self.obstacles):
+                return False
+        elif self.hits_pillar_hitbox():
+            return False
+        if capy_rect.top <= -50 or capy_rect.bottom >= HEIGHT: return False
+        return True
+
+    def hits_pillar_hitbox(self):
+        """
+        Broad phase: pillars are x-ordered (oldest, leftmost first), so only
+        those whose hitbox column overlaps the capybara's get a rect test,
+        using the cached hitboxes; nothing is allocated.
+        """
+        capy_rect = self.capy_rect
+        left = capy_rect.left; right = capy_rect.right
+        pool = self.obstacles
+        slots = pool.slots; cap = len(slots)
+        i = pool.head
+        for _ in range(pool.count):
+            ob = slots[i]
+            i += 1
+            if i == cap: i = 0
+            hx = int(ob.x) + OBSTACLE_HITBOX_INSET_X
+            if hx + OBSTACLE_HIT_W <= left: continue   # already behind the capybara
+            if hx >= right: break                     # this and every later pillar is ahead
+            r1, r2 = pool.hitboxes(ob)
+            if capy_rect.colliderect(r1) or capy_rect.colliderect(r2): return True
+        return False
+
+    def check_collision_all_pillars(self):
+        """Reference for check_collision_single_column(): fresh hitboxes for every pillar."""
+        capy_rect = self.capy_rect
+        for ob in self.obstacles:
+            r1, r2 = self.obstacle_hitboxes(ob)
+            if capy_rect.colliderect(r1) or capy_rect.colliderect(r2): return False
+        if capy_rect.top <= -50 or capy_rect.bottom >= HEIGHT: return False
+        return True
+
+    # ---------- human check ----------
+    def next_challenge_increment(self): return self.rng.randint(*CHALLENGE_EVERY)
+
+    def random_code(self, n=4):
+        return random_code(self.rng, n)
+
+    def start_challenge(self):
+        self.spawning_enabled = False
+        c = self.challenge
+        c["code"] = self.random_code(4)
+        c["typed"] = ""
+        c["deadline"] = self.time + c["time_limit"]
+        c["active"] = True
+        c["strikes"] = 0
+        self.state = "challenge"
+        self.events.append(("challenge", c["code"]))
+
+    def challenge_remaining(self):
+        return max(0.0, self.challenge["deadline"] - self.time)
+
+    def challenge_step(self):
+        c = self.challenge
+        # Wrong full entry -> strike
+        if len(c["typed"]) == 4 and c["typed"] != c["code"]:
+            c["strikes"] += 1
+            c["typed"] = ""
+
+        # Success
+        if c["typed"] == c["code"]:
+            c["active"] = False
+            self.state = "ready"
+            c["typed"] = ""; c["code"] = ""; c["deadline"] = 0.0; c["strikes"] = 0
+            self.obstacles.clear()
+            self.capy_movement = 0.0
+            self.next_spacing_x = OBSTACLE_SPACING_X + self.rng.randint(-SPACING_JITTER, SPACING_JITTER)
+            self.next_challenge_at = self.score + self.next_challenge_increment()
+            self.spawning_enabled = False
+            self.events.append(("challenge_passed", None))
+
+        # Out of time or too many strikes -> game over
+        elif self.time > c["deadline"] or c["strikes"] >= MAX_STRIKES:
+            self.game_over()